@@ -10,7 +10,25 @@ import os    # https://docs.python.org/3/library/filesys.html
 import csv   # https://docs.python.org/3/library/csv.html
 import sys   # https://docs.python.org/3/library/sys.html
 import traceback    # https://docs.python.org/3/library/traceback.html
-from datetime import datetime    # https://docs.python.org/3/library/datetime.html
+import calendar    # https://docs.python.org/3/library/calendar.html
+import threading   # https://docs.python.org/3/library/threading.html
+import heapq       # https://docs.python.org/3/library/heapq.html
+import itertools   # https://docs.python.org/3/library/itertools.html
+import tempfile    # https://docs.python.org/3/library/tempfile.html
+import io          # https://docs.python.org/3/library/io.html
+import gzip        # https://docs.python.org/3/library/gzip.html
+import json        # https://docs.python.org/3/library/json.html
+import time        # https://docs.python.org/3/library/time.html
+import math        # https://docs.python.org/3/library/math.html
+from collections import defaultdict, OrderedDict    # https://docs.python.org/3/library/collections.html
+from operator import itemgetter    # https://docs.python.org/3/library/operator.html
+from datetime import datetime, timedelta    # https://docs.python.org/3/library/datetime.html
+
+# optional, only needed for the month-end forecast
+try:
+    import numpy as np    # https://numpy.org/doc/stable/
+except ImportError:
+    np = None
 
 
 # constants
@@ -24,10 +42,55 @@ home_dir = os.path.expanduser("~")
 # default filename
 expense_filename = "AI_ML_CalTech/CB_AI_Projects/Personal_Expense_Tracker/expenses.csv"
 budget_filename = "AI_ML_CalTech/CB_AI_Projects/Personal_Expense_Tracker/budget.csv"
+recurring_filename = "AI_ML_CalTech/CB_AI_Projects/Personal_Expense_Tracker/recurring.csv"
+quarantine_filename = "AI_ML_CalTech/CB_AI_Projects/Personal_Expense_Tracker/quarantine.csv"
+category_filename = "AI_ML_CalTech/CB_AI_Projects/Personal_Expense_Tracker/categories.csv"
+workspace_filename = "AI_ML_CalTech/CB_AI_Projects/Personal_Expense_Tracker/workspace.csv"
 
 # default data storage  
 EXPENSE_FILE = os.path.join(home_dir, expense_filename)
 BUDGET_FILE = os.path.join(home_dir, budget_filename)
+RECURRING_FILE = os.path.join(home_dir, recurring_filename)
+QUARANTINE_FILE = os.path.join(home_dir, quarantine_filename)
+CATEGORY_FILE = os.path.join(home_dir, category_filename)
+WORKSPACE_FILE = os.path.join(home_dir, workspace_filename)
+
+# csv file headers
+EXPENSE_HEADER = ["Timestamp", "Transaction Date", "Amount", "Category", "Description", "ID"]
+BUDGET_HEADER = ["Timestamp", "Month", "Date", "Amount", "Description"]
+RECURRING_HEADER = ["Timestamp", "Start Date", "End Date", "Cadence", "Amount", "Category", "Description"]
+QUARANTINE_HEADER = ["Timestamp", "Source File", "Source Modified", "Line", "Reason", "Row"]
+WORKSPACE_HEADER = ["Name", "Expense File", "Budget File", "Recurring File"]
+JOURNAL_HEADER = ["Timestamp", "Action", "ID", "Transaction Date", "Amount", "Category", "Description"]
+
+# supported recurring expense cadences
+VALID_CADENCES = ["DAILY", "WEEKLY", "MONTHLY", "YEARLY"]
+
+# compact 'expense_entries' in the background once this fraction of slots are tombstones
+COMPACTION_RATIO = 0.25
+
+# fold the edit/delete journal into the expense file once it grows past this size
+JOURNAL_FOLD_BYTES = 1024 * 1024
+
+# sorted views hold at most this many rows in memory, larger data is merge sorted through temporary run files
+SORT_MEMORY_ROWS = 100000
+SORT_MERGE_FANIN = 64
+
+# exports stream rows in batches and write through a large buffer
+EXPORT_BATCH_ROWS = 10000
+EXPORT_BUFFER_BYTES = 1024 * 1024
+
+# forecast category trends are fitted over this many months before the forecast month
+FORECAST_TREND_MONTHS = 6
+
+# memory budget of the loaded workspace ledgers, least recently used ledgers are unloaded above it
+WORKSPACE_MAX_BYTES = 256 * 1024 * 1024
+
+# memory cap of the query cache (month totals, formatted rows, reports), least recently used entries are evicted
+CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# column widths for streamed views (sorted, top-N), rows are printed without a full pass to size the columns
+STREAM_COLUMN_WIDTHS = [19, 16, 10, 14, 30, 6]
 
 # get current year and month
 c_month = datetime.now() 
@@ -38,6 +101,57 @@ CURRENT_MONTH_NAME= c_month.strftime("%B")
 # global list 
 expense_entries = []
 budget_entries = []
+recurring_entries = []
+
+# expense ID -> slot in 'expense_entries'; deleted slots hold a None tombstone until compaction
+expense_index = {}
+next_expense_id = 1
+tombstone_count = 0
+
+# running aggregates per YYYY-MM month: [total amount, transaction count]
+month_totals = {}
+
+# guards 'expense_entries', 'expense_index' and 'month_totals' against the background compaction
+ledger_lock = threading.RLock()
+compaction_thread = None
+
+# IDs below this one are in the expense file, their edits and deletes go to the journal
+persisted_expense_id = 1
+journal_lock = threading.Lock()
+
+# memoized query results: cache key -> (value, size in bytes), in least recently used order
+query_cache = OrderedDict()
+query_cache_bytes = 0
+cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+# version counter per (ledger, YYYY-MM month) scope ("*" month for cross-month queries) and cached keys per scope
+month_versions = {}
+cache_month_keys = {}
+
+# unsaved changes in the active ledger (add, edit, delete since the last load/save)
+ledger_dirty = False
+
+# category table shared by every ledger: CATEGORY -> description, extended by categories.csv
+category_table = {
+    "FOOD": "meals, groceries",
+    "TRANSPORTATION": "gas, bus fare, rideshare",
+    "UTILITIES": "electric, gas",
+    "ENTERTAINMENT": "restaurant, movies, entertainment expenses",
+    "MISC": "anything other than the above categories"
+}
+
+# raw category value -> interned lower case category string, one string object per category across ledgers
+category_strings = {}
+
+# workspace: registered ledgers (name -> expense, budget and recurring file paths), loaded ledger states in least recently used order,
+# and month total aggregates of ledgers that are not loaded
+ledger_registry = {
+    "default": {"Name": "default", "Expense File": EXPENSE_FILE, "Budget File": BUDGET_FILE,
+                "Recurring File": RECURRING_FILE}
+}
+workspace_ledgers = OrderedDict()
+ledger_summaries = {}
+active_ledger = "default"
 
 
 # user interface for adding expense(s) 
@@ -75,7 +189,7 @@ def add_expenses():
         cntr = 0 
         while True:
 
-            t_category = input("Enter the category (e.g., FOOD, TRANSPORTATION, UTILITIES, ENTERTAINMENT, MISC): ")
+            t_category = input(f"Enter the category (e.g., {get_category_prompt()}): ")
         
             if validate_category(t_category):
                 break
@@ -123,6 +237,76 @@ def add_expenses():
     return True
 
 
+# user interface for correcting an expense by ID
+def edit_expenses():
+
+    expense_dict = prompt_expense_id("Edit expenses")
+
+    if expense_dict is None:
+        return False
+
+    print(f"Current entry: {expense_dict}")
+    print("Press enter to keep the current value.")
+
+    t_date = input(f"Enter the expense date (YYYY-MM-DD) [{expense_dict['Transaction Date']}]: ").strip()
+    t_category = input(f"Enter the category [{expense_dict['Category']}]: ").strip()
+    t_amount = input(f"Enter the amount [{expense_dict['Amount']}]: ").strip()
+    t_description = input(f"Enter a description [{expense_dict['Description']}]: ")
+
+    if not edit_expense_entry(expense_dict["ID"],
+                              t_date or None,
+                              t_category or None,
+                              t_amount or None,
+                              t_description or None):
+        return False
+
+    print(f"Expense '{expense_dict['ID']}' updated.")
+    return True
+
+
+# user interface for removing an expense by ID
+def delete_expenses():
+
+    expense_dict = prompt_expense_id("Delete expenses")
+
+    if expense_dict is None:
+        return False
+
+    print(f"Entry: {expense_dict}")
+    confirm = input("Do you want to delete this expense? (y/n): ").strip().lower()
+
+    if confirm != 'y':
+        print("Expense was not deleted.")
+        return True
+
+    if not delete_expense_entry(expense_dict["ID"]):
+        return False
+
+    print(f"Expense '{expense_dict['ID']}' deleted.")
+    return True
+
+
+# prompt for an expense ID, return the expense dictionary or None
+def prompt_expense_id(action_name):
+
+    cntr = 0
+    while True:
+
+        t_id = input("Enter the expense ID: ").strip()
+
+        expense_dict = get_expense_entry(int(t_id)) if t_id.isdigit() else None
+
+        if expense_dict is not None:
+            return expense_dict
+
+        print(f"Error: No expense with ID '{t_id}'. Please try again.")
+
+        cntr += 1
+        if cntr > 3:
+            print(f"Max try exceeded, exiting '{action_name}'")
+            return None
+
+
 # add an expense entry to global list 'expense_entries'
 def add_expense_entry(t_date, t_category, t_amount, t_description=""):
 
@@ -143,7 +327,7 @@ def add_expense_entry(t_date, t_category, t_amount, t_description=""):
     entry_date = datetime.now().strftime(DATE_TIME_FORMAT)
     
     # format input values
-    u_category = t_category.strip().lower()  # clean up the category input
+    u_category = intern_category(t_category)  # clean up the category input
     f_amount = float(t_amount)  # convert the amount to float
 
     # format input date 
@@ -151,17 +335,18 @@ def add_expense_entry(t_date, t_category, t_amount, t_description=""):
     o_date = datetime.strptime(c_date, "%Y-%m-%d") # convert to datetime object
     f_date = o_date.strftime(DATE_FORMAT)  # formatted date
 
-    # create the expense dictionary
+    # create the expense dictionary, the "ID" is assigned by 'register_expense_entry'
     expense_dict = {
         "Timestamp": entry_date,
         "Transaction Date": f_date,
         "Amount": f_amount,
         "Category": u_category,
-        "Description": t_description
+        "Description": t_description,
+        "ID": None
     }
     
     # very fist expense entry, add header first
-    if len(expense_entries) < 2:
+    if not expense_entries:
 
         # no expenses loaded (exists); initialize expense_entries
         # create expense header dictionary and insert in the new 'expense_enries'
@@ -170,621 +355,3303 @@ def add_expense_entry(t_date, t_category, t_amount, t_description=""):
             "Transaction Date": "Transaction Date",
             "Amount": "Amount",
             "Category": "Category",
-            "Description": "Description"
+            "Description": "Description",
+            "ID": "ID"
         }
         
         expense_entries.append(expense_header_dict)
         #expense_entries.insert (0, expense_header_dict)
 
     # add the expense to the global list
-    expense_entries.append(expense_dict)
+    register_expense_entry(expense_dict)
 
     #print("Expense added:", expense_dict)
     return True
 
 
-# validate the date format (example: YYYY-MM-DD)
-def validate_date(t_date):
+# append an expense dictionary to 'expense_entries', assign its stable ID and update the index and aggregates
+def register_expense_entry(expense_dict):
 
-    try:
-        datetime.strptime(t_date, DATE_FORMAT)
-        return True
-  
-    except ValueError:
-        # invalid date format
-        print(f"Error: '{t_date}' is an invalid date. Please use the YYYY-MM-DD format.")
-        # traceback.print_exc()
-        return False
+    global next_expense_id, ledger_dirty
 
-    except TypeError:
-        # input is not a string
-        print("Error: Invalid type for date. The date should be a string in YYYY-MM-DD format.")
-        # traceback.print_exc()
-        return False
+    with ledger_lock:
 
+        # keep the ID read from file, otherwise assign the next one
+        expense_id = expense_dict.get("ID")
 
-# validate the category
-def validate_category(t_category):
+        if not isinstance(expense_id, int) or expense_id in expense_index:
+            expense_id = next_expense_id
 
-    valid_categories = ["FOOD", "TRANSPORTATION", "UTILITIES", "ENTERTAINMENT", "MISC"]
-           
-    t_category_upper = t_category.strip().upper()
+        expense_dict["ID"] = expense_id
+        next_expense_id = max(next_expense_id, expense_id + 1)
 
-    if t_category_upper in valid_categories:
-        return True 
-    
-    else:
-        print(f"Error: {t_category} is an invalid category value. Please use one of the following valid categories:")
-        print("""
-              - FOOD: meals, groceries
-              - TRANSPORTATION: gas, bus fare, rideshare
-              - UTILITIES: electric, gas
-              - ENTERTAINMENT: restaurant, movies, entertainment expenses
-              - MISC: anything other than the above categories
-            """)
-        return False
+        expense_entries.append(expense_dict)
+        expense_index[expense_id] = len(expense_entries) - 1
 
+        update_month_totals(expense_dict, 1)
+        invalidate_month_cache(expense_dict["Transaction Date"][:7])
 
-# validate the amount (must be a positive number)
-def validate_amount(t_amount):
-    
-    try:
-        # convert input string to float
-        f_amount = float(t_amount)
-        
-        # ensure the amount is non-negative
-        if f_amount < 0:
-            print(f"Error: The amount '{t_amount}' cannot be negative.")
-            return False
-        
-        # valid amount value
-        return True
-        
-    except ValueError:
-        print(f"Error: The amount '{t_amount}' is an invalid format, expecting a numeric non-negative value .")
-        # traceback.print_exc()
-        return False
+        ledger_dirty = True
 
+    return expense_id
 
-# read expense.csv and populate global list 'expense_entries' 
-def load_expenses(file_path=None):
 
-    # default to the global constant EXPENSE_FILE if no path is provided
-    file_path = file_path or EXPENSE_FILE
+# add (sign=1) or remove (sign=-1) an expense from the 'month_totals' aggregates
+def update_month_totals(expense_dict, sign):
 
     try:
+        amount = round(float(expense_dict["Amount"]), 2)
 
-        if not os.path.exists(file_path):
-            print(f"Error: The file '{file_path}' does not exist.")        
-            return None
-    
-        with open(file_path, 'r', newline='') as file:
-            expense_reader = csv.reader(file)
+    except ValueError:
+        print(f"Invalid amount in expense entry; '{expense_dict}' , not counted in month totals")
+        return False
 
-            # iterate over the rows
-            for row in expense_reader:
-                
-                # expense entry has atleast 4 columns, 5th column (Description is optional)
-                if len(row) >= 4:
-                    
-                    entry_date = row[0]
-                    f_date = row[1]
-                    f_amount = row[2]
-                    u_category = row[3]
+    t_month = expense_dict["Transaction Date"][:7]
+    totals = month_totals.setdefault(t_month, [0.0, 0])
 
-                    try:
-                        t_description = row[4]
-                    
-                    except ValueError:
-                        print(f"Invalid row 'row[4]' or empty, skipping this entry.")
-                        continue
+    totals[0] = round(totals[0] + sign * amount, 2)
+    totals[1] += sign
 
-                # create the expense dictionary
-                expense_dict = {
-                    "Timestamp": entry_date,
-                    "Transaction Date": f_date,
-                     "Amount": f_amount,
-                     "Category": u_category,
-                    "Description": t_description
-                }
-    
-                # add the expense to the global list
-                expense_entries.append(expense_dict)
-        
-        return True
-    
-    except FileNotFoundError:
-        print(f"Error: The file path '{file_path}' could not be found.")
-        return None
-    
-    except PermissionError:
-        print(f"Error: You do not have permission to write to '{file_path}'.")
-        return None
+    if totals[1] == 0:
+        del month_totals[t_month]
 
-    except IsADirectoryError:
-        print(f"Error: The path '{file_path}' is a directory, not a file.")
-        return None
+    return True
 
-    except Exception as err:
-        print(f"Error while reading the '{file_path}' file: {err}")
-        # traceback.print_exc()
-        return None
 
+# iterate live expense rows, skipping the header and deleted (tombstone) slots
+def iter_expense_rows():
 
-# display expenses from global 'expense_entries' list ( of dictionaries )
-def view_expenses():
+    # slicing takes a snapshot, safe while a compaction swaps the list contents
+    for row in expense_entries[1:]:
 
-    # check if the 'expense_entries' list is empty
-    if not expense_entries:
-        print("No expenses to display. The global list 'expense_entries' is empty.")
-        return None
-    
-    headers = expense_entries[0]
+        if row is not None:
+            yield row
 
-    # get column widths 
-    column_widths = get_dict_column_widths(expense_entries[1:], headers)
 
-    # print separator line
-    def print_separator():
-        separator_length = sum(column_widths) + len(column_widths) * 3 - 3  # width + spaces, less 3 char (5th | column separator)
-        print("-" * separator_length)
+# get an expense dictionary by ID in O(1), None if it does not exist or was deleted
+def get_expense_entry(expense_id):
 
-    print("\n")
-    print_separator()
+    # the background compaction moves slots, index and list are read together under the lock
+    with ledger_lock:
 
-    # print the header
-    print_aligned_row(headers, column_widths, headers)
+        slot = expense_index.get(expense_id)
 
-    print_separator()
+        if slot is None:
+            return None
 
-    # get dictionary size using the expense entry header
-    expense_dict_size = len(expense_entries[0])
-    
-    for row in expense_entries[1:]:
+        return expense_entries[slot]
 
-        if len(row) == expense_dict_size:
-            # print each expense entry, aligned based on the column widths
-            print_aligned_row(row, column_widths, headers)
 
-        else:
-            print(f"Incomplete expense entry; '{row}' , skipping this entry")
+# correct an expense entry in place; arguments left as None keep their current value
+def edit_expense_entry(expense_id, t_date=None, t_category=None, t_amount=None, t_description=None):
 
-    print_separator()
+    global ledger_dirty
 
-    return True
+    if t_date is not None and not validate_date(t_date):
+        print("Invalid date format. Please enter a valid date (YYYY-MM-DD).")
+        return False
 
+    if t_category is not None and not validate_category(t_category):
+        print("Invalid category. Please enter a valid category.")
+        return False
 
-# get expense_entries column widths
-def get_dict_column_widths(rows, headers):
-    column_widths = []
-    
-    for header in headers:
-        
-        # find the max width for this column (header + any row values)
-        max_width = max(len(str(header)), max(len(str(row.get(header, ''))) for row in rows))
-        column_widths.append(max_width)
-    
-    return column_widths
+    if t_amount is not None and not validate_amount(t_amount):
+        print("Invalid amount. Please enter a valid amount (greater than 0).")
+        return False
 
+    with ledger_lock:
 
-# print rows with alignment based on column widths
-def print_aligned_row(row, column_widths, headers):
+        expense_dict = get_expense_entry(expense_id)
 
-    # ensure the row has the correct number of values
-    # 'zip()'  https://docs.python.org/3.3/library/functions.html
-    # 'str()', 'ljust()'  https://docs.python.org/3/library/stdtypes.html#textseq
+        if expense_dict is None:
+            print(f"Error: No expense with ID '{expense_id}'.")
+            return False
 
-    aligned_row = " | ".join(f"{str(row.get(header, '')).ljust(width)}" 
-                             for header, width in zip(headers, column_widths))  
-    print(aligned_row)
+        # move the old values out of the month aggregates, then the new ones in
+        update_month_totals(expense_dict, -1)
+        invalidate_month_cache(expense_dict["Transaction Date"][:7])
 
+        if t_date is not None:
+            # format input date, same as 'add_expense_entry' (e.g. 2024-3-7 -> 2024-03-07)
+            expense_dict["Transaction Date"] = datetime.strptime(t_date.strip(), DATE_FORMAT).strftime(DATE_FORMAT)
 
-# set month's budget allocation 
-def set_month_budget():
+        if t_category is not None:
+            expense_dict["Category"] = intern_category(t_category)
 
-    global budget_entries
+        if t_amount is not None:
+            expense_dict["Amount"] = round(float(t_amount), 2)
 
-    cntr = 0
-    while True:
+        if t_description is not None:
+            expense_dict["Description"] = t_description
 
-        month_budget_date = input("\nEnter month YYYY-MM : ")
+        update_month_totals(expense_dict, 1)
+        invalidate_month_cache(expense_dict["Transaction Date"][:7])
 
-        if validate_month_format(month_budget_date):
-            break
+        # saved rows are corrected with one journal record, unsaved ones wait for the next save
+        if expense_id < persisted_expense_id:
+            append_journal_record("edit", expense_dict)
         else:
-            print(f"Invalid month date format {month_budget_date}. Please use YYYY-MM format\n")
-            cntr += 1
-            if cntr >= 3:
-                print(f"Max '{cntr}' date entry try exceeded, exiting 'Add month budget'.")
-                return False
+            ledger_dirty = True
 
-    cntr = 0
-    while True:
+    return True
 
-        month_budget_amount = input("\nEnter budget allocation amount : ")
 
-        if validate_amount(month_budget_amount):
-            break
+# delete an expense entry by ID, leaving a tombstone in its slot
+# index and aggregates are updated immediately, the slot is reclaimed by the background compaction
+def delete_expense_entry(expense_id):
 
-        else:    
-            print(f"Invalid amount format {month_budget_amount}.\n")
-            cntr += 1
-            if cntr >= 3:
-                print(f"Max '{cntr}' amount entry try exceeded, exiting 'Add month budget'.")
-                return False
+    global tombstone_count, ledger_dirty
 
-    # get current year and month
-    c_date = datetime.now() 
-    o_date = c_date.strftime(MONTH_FORMAT)
-    month_name = c_date.strftime("%B")
+    with ledger_lock:
 
-    month_budget_Description = input("\nEnter budget description (optional) : ")
+        slot = expense_index.pop(expense_id, None)
 
-    if month_budget_Description == "":
-        
-        month_budget_Description = f"{month_name} budget allocation"
+        if slot is None:
+            print(f"Error: No expense with ID '{expense_id}'.")
+            return False
 
+        update_month_totals(expense_entries[slot], -1)
+        invalidate_month_cache(expense_entries[slot]["Transaction Date"][:7])
 
-    budget_dict = {
-        "Timestamp": c_date,
-        "Month": month_name,
-        "Date": month_budget_date,
-        "Amount": month_budget_amount,
-        "Description": month_budget_Description
-    }
+        if expense_id < persisted_expense_id:
+            append_journal_record("delete", expense_entries[slot])
+        else:
+            ledger_dirty = True
 
-    # use of 'copy' to avoid potentially/accidentally modifying 'budget_entries' dictionary entry 
-    if len(budget_entries) > 1: 
+        expense_entries[slot] = None
+        tombstone_count += 1
 
-        # set (override) the current budget dictionary entry in the global list
-        # skip budget[0] it's the header
-        budget_entries[1] = budget_dict.copy()
-    
-    else:
-        
-        # initialize 'budget_entries' global list
-        if not budget_entries:
+        if tombstone_count > COMPACTION_RATIO * len(expense_entries):
+            start_compaction()
 
-            # add new budget entry
-            budget_entries.append(budget_dict.copy())
-        
-    # save budget information to csv file
-    save_budget_to_file(BUDGET_FILE)
-    print(f"\n*** Budget information is saved in {BUDGET_FILE} file by default ***\n")
     return True
 
 
-# validate month format YYYY-MM 
-def validate_month_format(b_month):
-    
-    # ensure the input is a string (convert to string if it's not)
-    if not isinstance(b_month, str):
-        b_month = str(b_month)
+# start the background compaction of the active ledger, unless one is already running
+# the ledger's file, list and index are handed to the thread, a ledger switch does not change its target
+def start_compaction():
 
-    # clean input and check for empty string or None
-    c_month = b_month.strip() if b_month else ""
+    global compaction_thread
 
-    # check if the cleaned input is empty (after stripping spaces)
-    if not c_month:
-        print("Error: The month input is empty. Please provide a valid month in YYYY-MM format.")
+    if compaction_thread is not None and compaction_thread.is_alive():
         return False
 
-    try:
-        # parse the date using the expected format
-        datetime.strptime(c_month, MONTH_FORMAT)
+    compaction_thread = threading.Thread(target=compact_expense_entries,
+                                         args=(EXPENSE_FILE, expense_entries, expense_index), daemon=True)
+    compaction_thread.start()
+    return True
 
-        # month is valid
-        return True
 
-    except ValueError:
-        print(f"Error: The month '{b_month}' is invalid. Please use the YYYY-MM format.")
-        traceback.print_exc()
-        return False
-        
+# reclaim tombstone slots in a ledger's 'expense_entries' and rebuild its ID index,
+# then fold the journal of the ledger's expense file into the file
+# 'entries' and 'index' default to the active ledger's
+def compact_expense_entries(file_path=None, entries=None, index=None):
 
-# save global list 'budget_entries' to budget.csv file
-def save_budget_to_file(file_path=None):
+    global tombstone_count
 
-    if not budget_entries:
-        print("No budget to save.")
-        return None
-    
+    if entries is None:
+        entries, index = expense_entries, expense_index
+
+    fold_expense_journal(file_path)
+
+    with ledger_lock:
+
+        live_entries = [row for row in entries if row is not None]
+
+        if len(live_entries) == len(entries):
+            return False
+
+        # build the new index first, then swap list and index together
+        live_index = {row["ID"]: slot for slot, row in enumerate(live_entries) if slot > 0}
+
+        # swap the contents in place, other references to the list and index (e.g. a parked ledger state) stay valid
+        entries[:] = live_entries
+        index.clear()
+        index.update(live_index)
+
+        # the tombstone count lives in the globals while the ledger is active, in its parked state otherwise
+        if entries is expense_entries:
+            tombstone_count = 0
+
+        for ledger_state in workspace_ledgers.values():
+            if ledger_state["expense_entries"] is entries:
+                ledger_state["tombstone_count"] = 0
+
+    return True
+
+
+# path of the append-only journal of edits and deletes kept next to an expense file
+def get_journal_path(file_path=None):
+
+    return (file_path or EXPENSE_FILE) + ".journal.csv"
+
+
+# append an edit or delete record for an expense that is already in the expense file
+# a correction costs one appended line, the records are applied at load time and folded in by the compaction
+def append_journal_record(action, expense_dict, file_path=None):
+
+    journal_path = get_journal_path(file_path)
+
+    try:
+
+        with journal_lock:
+
+            file_exists = os.path.exists(journal_path)
+
+            with open(journal_path, 'a', newline='') as file:
+                journal_writer = csv.writer(file)
+
+                if not file_exists:
+                    journal_writer.writerow(JOURNAL_HEADER)
+
+                journal_writer.writerow([datetime.now().strftime(DATE_TIME_FORMAT), action, expense_dict["ID"],
+                                         expense_dict["Transaction Date"], expense_dict["Amount"],
+                                         expense_dict["Category"], expense_dict["Description"]])
+
+                journal_bytes = file.tell()
+
+        # a long journal slows down every load, fold it into the expense file
+        if journal_bytes > JOURNAL_FOLD_BYTES:
+            start_compaction()
+
+        return True
+
+    except Exception as err:
+        print(f"Error while writing the '{journal_path}' file: {err}")
+        traceback.print_exc()
+        return False
+
+
+# read a journal file into (ID -> latest edited fields, set of deleted IDs)
+def read_expense_journal(journal_path):
+
+    journal_edits = {}
+    journal_deletes = set()
+
+    if not os.path.exists(journal_path):
+        return journal_edits, journal_deletes
+
+    with open(journal_path, 'r', newline='') as file:
+
+        for row in csv.reader(file):
+
+            if len(row) != len(JOURNAL_HEADER) or not row[2].isdigit():
+                continue
+
+            expense_id = int(row[2])
+
+            if row[1] == "delete":
+                journal_deletes.add(expense_id)
+                journal_edits.pop(expense_id, None)
+
+            elif row[1] == "edit":
+                journal_edits[expense_id] = {
+                    "Transaction Date": row[3],
+                    "Amount": float(row[4]),
+                    "Category": intern_category(row[5]),
+                    "Description": row[6]
+                }
+
+    return journal_edits, journal_deletes
+
+
+# stream the typed rows of an expense file with its journal applied, for readers that do not load the ledger
+# IDs are assigned as 'load_expenses' does, so journal IDs match legacy rows without ID
+def iter_journaled_file_rows(file_path, quarantine_rows=None):
+
+    journal_edits, journal_deletes = read_expense_journal(get_journal_path(file_path))
+
+    kept_ids = set()
+    next_id = 1
+
+    for expense_dict in iter_ledger_file_rows(file_path, quarantine_rows):
+
+        expense_id = expense_dict["ID"]
+
+        if expense_id is None or expense_id in kept_ids:
+            expense_id = next_id
+            expense_dict["ID"] = expense_id
+
+        if expense_id >= next_id:
+            next_id = expense_id + 1
+
+        if expense_id in journal_deletes:
+            continue
+
+        kept_ids.add(expense_id)
+
+        if expense_id in journal_edits:
+            expense_dict.update(journal_edits[expense_id])
+
+        yield expense_dict
+
+
+# rewrite the expense file with its journal applied, then remove the journal
+# malformed rows stay in the file, as on load they are only quarantined
+def fold_expense_journal(file_path=None):
+
+    file_path = file_path or EXPENSE_FILE
+    journal_path = get_journal_path(file_path)
+    temp_path = file_path + ".tmp"
+
+    try:
+
+        with journal_lock:
+
+            if not os.path.exists(journal_path) or not os.path.exists(file_path):
+                return False
+
+            with open(temp_path, 'w', newline='') as file:
+                expense_writer = csv.writer(file)
+                expense_writer.writerow(EXPENSE_HEADER)
+
+                # rows that fail to parse are copied through verbatim and in place, the fold never drops them
+                malformed_rows = []
+
+                for expense_dict in iter_journaled_file_rows(file_path, malformed_rows):
+
+                    if malformed_rows:
+                        expense_writer.writerows(row for line_num, reason, row in malformed_rows)
+                        malformed_rows.clear()
+
+                    expense_writer.writerow([expense_dict["Timestamp"], expense_dict["Transaction Date"],
+                                             expense_dict["Amount"], expense_dict["Category"],
+                                             expense_dict["Description"], expense_dict["ID"]])
+
+                expense_writer.writerows(row for line_num, reason, row in malformed_rows)
+
+            os.replace(temp_path, file_path)
+            os.remove(journal_path)
+
+        return True
+
+    except Exception as err:
+        print(f"Error while folding the '{journal_path}' journal: {err}")
+        traceback.print_exc()
+        return False
+
+
+# cache key for a query, scoped to the active ledger and a month; the scope's version counter is
+# part of the key, so a value computed before an invalidation is never served after it
+def get_cache_key(kind, t_month, *args):
+
+    scope = (active_ledger, t_month)
+
+    return (kind, scope, month_versions.get(scope, 0)) + args
+
+
+# approximate memory footprint of a cached value, in bytes
+def get_cache_size(value):
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, (list, tuple)):
+        size += sum(get_cache_size(item) for item in value)
+
+    elif isinstance(value, dict):
+        size += sum(get_cache_size(key) + get_cache_size(item) for key, item in value.items())
+
+    # views (e.g. from reshape) do not own their data, sys.getsizeof only counts the array header
+    elif np is not None and isinstance(value, np.ndarray) and value.base is not None:
+        size += value.nbytes
+
+    return size
+
+
+# look up a query result, None on a miss
+def cache_get(cache_key):
+
+    value = query_cache.get(cache_key)
+
+    if value is None:
+        cache_stats["misses"] += 1
+        return None
+
+    # most recently used entries move to the end
+    query_cache.move_to_end(cache_key)
+    cache_stats["hits"] += 1
+
+    return value[0]
+
+
+# store a query result, evicting least recently used entries above CACHE_MAX_BYTES
+def cache_put(cache_key, value):
+
+    global query_cache_bytes
+
+    size = get_cache_size(value)
+
+    # a result larger than the whole cache is not worth storing
+    if size > CACHE_MAX_BYTES:
+        return False
+
+    remove_cache_entry(cache_key)
+
+    while query_cache and query_cache_bytes + size > CACHE_MAX_BYTES:
+        remove_cache_entry(next(iter(query_cache)))
+        cache_stats["evictions"] += 1
+
+    query_cache[cache_key] = (value, size)
+    query_cache_bytes += size
+    cache_month_keys.setdefault(cache_key[1], set()).add(cache_key)
+
+    return True
+
+
+# remove a single cache entry, if present
+def remove_cache_entry(cache_key):
+
+    global query_cache_bytes
+
+    value = query_cache.pop(cache_key, None)
+
+    if value is None:
+        return False
+
+    query_cache_bytes -= value[1]
+
+    month_keys = cache_month_keys.get(cache_key[1])
+
+    if month_keys is not None:
+        month_keys.discard(cache_key)
+
+        if not month_keys:
+            del cache_month_keys[cache_key[1]]
+
+    return True
+
+
+# invalidate the active ledger's cached queries of a month, and its cross-month ("*") ones such as column widths
+def invalidate_month_cache(t_month):
+
+    for scope in ((active_ledger, t_month), (active_ledger, "*")):
+
+        month_versions[scope] = month_versions.get(scope, 0) + 1
+
+        for cache_key in list(cache_month_keys.get(scope, ())):
+            remove_cache_entry(cache_key)
+            cache_stats["invalidations"] += 1
+
+
+# invalidate the active ledger's cached queries of one kind in every month, e.g. reports after a budget change
+def invalidate_cache_kind(kind):
+
+    for cache_key in [cache_key for cache_key in query_cache
+                      if cache_key[0] == kind and cache_key[1][0] == active_ledger]:
+        remove_cache_entry(cache_key)
+        cache_stats["invalidations"] += 1
+
+
+# invalidate the cached months a recurring rule contributes to, from its start to its end date
+def invalidate_recurring_cache(r_start, r_end=""):
+
+    first_month = r_start[:7]
+    last_month = r_end[:7] if r_end else "9999-12"
+
+    for t_month in [scope[1] for scope in cache_month_keys
+                    if scope[0] == active_ledger and first_month <= scope[1] <= last_month]:
+        invalidate_month_cache(t_month)
+
+    # months not cached yet get a new version as well as the cross-month entries
+    invalidate_month_cache("*")
+
+
+# invalidate every cached query of a ledger, when it is loaded from its files or unloaded
+def invalidate_ledger_cache(name):
+
+    for scope in [scope for scope in cache_month_keys if scope[0] == name]:
+
+        month_versions[scope] = month_versions.get(scope, 0) + 1
+
+        for cache_key in list(cache_month_keys.get(scope, ())):
+            remove_cache_entry(cache_key)
+            cache_stats["invalidations"] += 1
+
+
+# print the query cache hit/miss counters and memory use, for tuning CACHE_MAX_BYTES
+def print_cache_stats():
+
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    hit_rate = 100.0 * cache_stats["hits"] / lookups if lookups else 0.0
+
+    print(f"\n{'-' * 40}")
+    print(f"\n   Query cache statistics")
+    print(f"\n{'-' * 40}")
+    print(f"\nEntries: {len(query_cache)}")
+    print(f"Memory: {query_cache_bytes} of {CACHE_MAX_BYTES} bytes")
+    print(f"Hits: {cache_stats['hits']}  Misses: {cache_stats['misses']}  Hit rate: {hit_rate:.1f}%")
+    print(f"Evictions: {cache_stats['evictions']}  Invalidations: {cache_stats['invalidations']}\n")
+
+    return True
+
+
+# validate the date format (example: YYYY-MM-DD)
+def validate_date(t_date):
+
+    try:
+        datetime.strptime(t_date, DATE_FORMAT)
+        return True
+  
+    except ValueError:
+        # invalid date format
+        print(f"Error: '{t_date}' is an invalid date. Please use the YYYY-MM-DD format.")
+        # traceback.print_exc()
+        return False
+
+    except TypeError:
+        # input is not a string
+        print("Error: Invalid type for date. The date should be a string in YYYY-MM-DD format.")
+        # traceback.print_exc()
+        return False
+
+
+# validate the category against the shared category table
+def validate_category(t_category):
+
+    t_category_upper = t_category.strip().upper()
+
+    if t_category_upper in category_table:
+        return True 
+    
+    else:
+        print(f"Error: {t_category} is an invalid category value. Please use one of the following valid categories:")
+        print("")
+        for name, description in category_table.items():
+            print(f"              - {name}: {description}")
+        print("")
+        return False
+
+
+# interned lower case category string, shared by every ledger row of that category
+def intern_category(t_category):
+
+    u_category = category_strings.get(t_category)
+
+    if u_category is None:
+        u_category = sys.intern(t_category.strip().lower())
+        category_strings[t_category] = u_category
+        category_strings[u_category] = u_category
+
+    return u_category
+
+
+# category names for input prompts
+def get_category_prompt():
+
+    return ", ".join(category_table)
+
+
+# validate the amount (must be a positive number)
+def validate_amount(t_amount):
+    
+    try:
+        # convert input string to float
+        f_amount = float(t_amount)
+        
+        # ensure the amount is non-negative
+        if f_amount < 0:
+            print(f"Error: The amount '{t_amount}' cannot be negative.")
+            return False
+
+        # 'nan' and 'inf' parse as floats
+        if not math.isfinite(f_amount):
+            print(f"Error: The amount '{t_amount}' is not a finite number.")
+            return False
+        
+        # valid amount value
+        return True
+        
+    except ValueError:
+        print(f"Error: The amount '{t_amount}' is an invalid format, expecting a numeric non-negative value .")
+        # traceback.print_exc()
+        return False
+
+
+# read expense.csv and populate global list 'expense_entries' 
+# malformed rows are skipped and recorded in the quarantine file, the source file is left unchanged
+def load_expenses(file_path=None):
+
+    global next_expense_id, persisted_expense_id
+
+    # default to the global constant EXPENSE_FILE if no path is provided
+    file_path = file_path or EXPENSE_FILE
+
+    quarantine_rows = []
+
+    try:
+
+        if not os.path.exists(file_path):
+            print(f"Error: The file '{file_path}' does not exist.")        
+            return None
+
+        with ledger_lock:
+
+            # the header is always expense_entries[0]
+            if not expense_entries:
+                expense_entries.append(dict(zip(EXPENSE_HEADER, EXPENSE_HEADER)))
+
+            # edits and deletes recorded since the file was last written
+            journal_edits, journal_deletes = read_expense_journal(get_journal_path(file_path))
+            journaled = bool(journal_edits or journal_deletes)
+
+            # local bindings, this loop runs once per row
+            entries_append = expense_entries.append
+            first_slot = len(expense_entries)
+            next_id = next_expense_id
+            strptime = datetime.strptime
+            get_category = category_strings.get
+            inf = math.inf
+
+            # raw date -> [YYYY-MM-DD, amount sum, row count]; dates repeat across rows, each distinct one
+            # is parsed once and the month totals are summed per date, then per month after the loop
+            date_totals = {}
+            get_date_totals = date_totals.get
+            edited_rows = []
+
+            # IDs below 'next_id' (missing, or out of order in a hand edited file) are checked against
+            # the IDs loaded so far; 'expense_index' itself is filled in one pass after the loop
+            loaded_ids = None
+            checked_slot = first_slot
+
+            with open(file_path, 'r', newline='') as file:
+
+                # same parse as 'iter_ledger_file_rows': the header is checked once
+                first_line = file.readline()
+                line_num = 1
+                lines = file
+
+                # a file without header starts with data
+                if not is_header_row(next(csv.reader([first_line]), []), EXPENSE_HEADER):
+                    lines = itertools.chain([first_line], file)
+                    line_num = 0
+
+                for line in lines:
+
+                    line_num += 1
+
+                    # only quoted fields need the csv module, plain rows are split directly
+                    if '"' in line:
+                        row, extra_lines = read_quoted_csv_row(line, lines)
+                        line_num += extra_lines
+
+                    else:
+                        row = line.rstrip("\r\n").split(",")
+
+                    # Timestamp, Transaction Date, Amount, Category; Description and ID are optional
+                    row_size = len(row)
+
+                    if row_size == 6:
+                        timestamp, f_date, f_amount, u_category, t_description, expense_id = row
+
+                    elif row_size == 5:
+                        timestamp, f_date, f_amount, u_category, t_description = row
+                        expense_id = ""
+
+                    elif row_size == 4:
+                        timestamp, f_date, f_amount, u_category = row
+                        t_description = expense_id = ""
+
+                    else:
+                        # a blank line splits into one empty field, csv reads it as no field
+                        if row == [""]:
+                            row, row_size = [], 0
+
+                        quarantine_rows.append((line_num, f"expected 4 to 6 columns, got {row_size}", row))
+                        continue
+
+                    totals = get_date_totals(f_date)
+
+                    if totals is None:
+                        try:
+                            # normalized, e.g. 2024-3-7 -> 2024-03-07, so month keys are always YYYY-MM
+                            totals = [strptime(f_date.strip(), DATE_FORMAT).strftime(DATE_FORMAT), 0.0, 0]
+                            date_totals[f_date] = totals
+
+                        except ValueError:
+                            quarantine_rows.append((line_num, f"invalid date '{f_date}'", row))
+                            continue
+
+                    try:
+                        f_amount = float(f_amount)
+
+                    except ValueError:
+                        f_amount = -1.0
+
+                    # also rejects 'nan' and 'inf'
+                    if not 0 <= f_amount < inf or not u_category:
+                        reason = f"invalid amount '{row[2]}'" if u_category else "empty category"
+                        quarantine_rows.append((line_num, reason, row))
+                        continue
+
+                    try:
+                        expense_id = int(expense_id)
+
+                    except ValueError:
+                        expense_id = -1
+
+                    # same ID assignment as 'register_expense_entry': missing or already used IDs get the next one
+                    if expense_id >= next_id:
+                        next_id = expense_id + 1
+
+                    else:
+                        if loaded_ids is None:
+                            loaded_ids = set(expense_index)
+
+                        loaded_ids.update(expense_dict["ID"] for expense_dict in expense_entries[checked_slot:])
+                        checked_slot = len(expense_entries)
+
+                        if expense_id < 0 or expense_id in loaded_ids:
+                            expense_id = next_id
+                            next_id += 1
+
+                    expense_dict = {
+                        "Timestamp": timestamp,
+                        "Transaction Date": totals[0],
+                        "Amount": f_amount,
+                        "Category": get_category(u_category) or intern_category(u_category),
+                        "Description": t_description,
+                        "ID": expense_id
+                    }
+
+                    if journaled:
+
+                        if expense_id in journal_deletes:
+                            continue
+
+                        if expense_id in journal_edits:
+                            expense_dict.update(journal_edits[expense_id])
+                            entries_append(expense_dict)
+                            edited_rows.append(expense_dict)
+                            continue
+
+                    entries_append(expense_dict)
+                    totals[1] += f_amount
+                    totals[2] += 1
+
+            # index the loaded rows in one pass
+            expense_index.update(zip(map(itemgetter("ID"), expense_entries[first_slot:]), itertools.count(first_slot)))
+
+            next_expense_id = next_id
+            persisted_expense_id = next_id
+
+            # per date totals to month totals, journal edited rows by their edited date and amount
+            month_sums = defaultdict(float)
+            month_counts = defaultdict(int)
+
+            for n_date, f_sum, t_count in date_totals.values():
+                if t_count:
+                    month_sums[n_date[:7]] += f_sum
+                    month_counts[n_date[:7]] += t_count
+
+            for expense_dict in edited_rows:
+                month_sums[expense_dict["Transaction Date"][:7]] += expense_dict["Amount"]
+                month_counts[expense_dict["Transaction Date"][:7]] += 1
+
+            for t_month, t_count in month_counts.items():
+                totals = month_totals.setdefault(t_month, [0.0, 0])
+                totals[0] = round(totals[0] + month_sums[t_month], 2)
+                totals[1] += t_count
+
+                invalidate_month_cache(t_month)
+
+        save_quarantine_rows(file_path, quarantine_rows)
+        return True
+    
+    except FileNotFoundError:
+        print(f"Error: The file path '{file_path}' could not be found.")
+        return None
+    
+    except PermissionError:
+        print(f"Error: You do not have permission to read '{file_path}'.")
+        return None
+
+    except IsADirectoryError:
+        print(f"Error: The path '{file_path}' is a directory, not a file.")
+        return None
+
+    except Exception as err:
+        print(f"Error while reading the '{file_path}' file: {err}")
+        # traceback.print_exc()
+        return None
+
+
+# stream typed expense dictionaries from an expense.csv file, one row at a time
+# the header is checked once; malformed rows are appended to 'quarantine_rows' as (line, reason, row), when given
+def iter_ledger_file_rows(file_path, quarantine_rows=None):
+
+    # dates repeat across rows, parse each distinct one once: raw date -> YYYY-MM-DD
+    valid_dates = {}
+    strptime = datetime.strptime
+    isfinite = math.isfinite
+
+    with open(file_path, 'r', newline='') as file:
+        expense_reader = csv.reader(file)
+
+        first_row = next(expense_reader, None)
+
+        if first_row is None:
+            return
+
+        rows = expense_reader
+
+        # a file without header starts with data
+        if not is_header_row(first_row, EXPENSE_HEADER):
+            rows = itertools.chain([first_row], expense_reader)
+
+        for row in rows:
+
+            # Timestamp, Transaction Date, Amount, Category; Description and ID are optional
+            row_size = len(row)
+
+            if row_size == 6:
+                timestamp, f_date, f_amount, u_category, t_description, expense_id = row
+
+            elif row_size == 5:
+                timestamp, f_date, f_amount, u_category, t_description = row
+                expense_id = ""
+
+            elif row_size == 4:
+                timestamp, f_date, f_amount, u_category = row
+                t_description = expense_id = ""
+
+            else:
+                if quarantine_rows is not None:
+                    quarantine_rows.append((expense_reader.line_num, f"expected 4 to 6 columns, got {row_size}", row))
+                continue
+
+            n_date = valid_dates.get(f_date)
+
+            if n_date is None:
+                try:
+                    # normalized, e.g. 2024-3-7 -> 2024-03-07, so month keys are always YYYY-MM
+                    n_date = strptime(f_date.strip(), DATE_FORMAT).strftime(DATE_FORMAT)
+                    valid_dates[f_date] = n_date
+
+                except ValueError:
+                    if quarantine_rows is not None:
+                        quarantine_rows.append((expense_reader.line_num, f"invalid date '{f_date}'", row))
+                    continue
+
+            f_date = n_date
+
+            try:
+                f_amount = float(f_amount)
+
+            except ValueError:
+                f_amount = -1.0
+
+            # also rejects 'nan' and 'inf'
+            if not (f_amount >= 0 and isfinite(f_amount)) or not u_category:
+                if quarantine_rows is not None:
+                    reason = f"invalid amount '{row[2]}'" if u_category else "empty category"
+                    quarantine_rows.append((expense_reader.line_num, reason, row))
+                continue
+
+            yield {
+                "Timestamp": timestamp,
+                "Transaction Date": f_date,
+                "Amount": f_amount,
+                "Category": category_strings.get(u_category) or intern_category(u_category),
+                "Description": t_description,
+                "ID": int(expense_id) if expense_id.isdigit() else None
+            }
+
+
+# parse a csv record that contains quotes, continuing over line breaks inside quoted fields
+# returns (row, number of extra lines read)
+def read_quoted_csv_row(line, lines):
+
+    extra_lines = 0
+
+    # an odd number of quotes means a quoted field continues on the next line
+    while line.count('"') % 2:
+
+        next_line = next(lines, None)
+
+        if next_line is None:
+            break
+
+        line += next_line
+        extra_lines += 1
+
+    return next(csv.reader([line]), []), extra_lines
+
+
+# check whether a csv row is the header, compared case-insensitively on the leading columns
+def is_header_row(row, header):
+
+    return [value.strip().lower() for value in row[:len(header)]] == [name.lower() for name in header[:len(row)]]
+
+
+# append malformed rows to the quarantine file, with their source file, its modification time and line number
+# the source file is left unchanged; rows already quarantined for the same file version are not appended again
+def save_quarantine_rows(source_path, quarantine_rows, file_path=None):
+
+    if not quarantine_rows:
+        return None
+
+    # default to global QUARANTINE_FILE if no path is provided
+    file_path = file_path or QUARANTINE_FILE
+
+    try:
+
+        file_exists = os.path.exists(file_path)
+        source_mtime = repr(os.stat(source_path).st_mtime)
+
+        # (line number) of the rows already quarantined for this source file version
+        quarantined_lines = set()
+
+        if file_exists:
+            with open(file_path, 'r', newline='') as file:
+                for row in csv.reader(file):
+                    if len(row) == len(QUARANTINE_HEADER) and row[1] == source_path and row[2] == source_mtime:
+                        quarantined_lines.add(row[3])
+
+        new_rows = [(line_num, reason, row) for line_num, reason, row in quarantine_rows
+                    if str(line_num) not in quarantined_lines]
+
+        if new_rows:
+
+            with open(file_path, 'a', newline='') as file:
+                quarantine_writer = csv.writer(file)
+
+                if not file_exists:
+                    quarantine_writer.writerow(QUARANTINE_HEADER)
+
+                entry_date = datetime.now().strftime(DATE_TIME_FORMAT)
+                quarantine_writer.writerows([entry_date, source_path, source_mtime, line_num, reason, ",".join(row)]
+                                            for line_num, reason, row in new_rows)
+
+        print(f"Warning: {len(quarantine_rows)} malformed row(s) in '{source_path}' were skipped, see {file_path}")
+        return True
+
+    except PermissionError:
+        print(f"Error: You do not have permission to write to '{file_path}'.")
+        return None
+
+    except Exception as err:
+        print(f"Error while writing the '{file_path}' file: {err}")
+        traceback.print_exc()
+        return None
+
+
+# display expenses from global 'expense_entries' list ( of dictionaries )
+# rows are grouped by transaction month; each month's formatted block is cached until that month changes
+def view_expenses():
+
+    # check if the 'expense_entries' list is empty
+    if not expense_entries:
+        print("No expenses to display. The global list 'expense_entries' is empty.")
+        return None
+    
+    headers = expense_entries[0]
+
+    # months with live expenses; recurring rules are expanded only within that span
+    view_months = sorted(month_totals)
+
+    if view_months and len(recurring_entries) > 1:
+        view_months = list(get_month_range(view_months[0], view_months[-1]))
+
+    # rows grouped by month, only built when something is not cached
+    month_rows = None
+
+    # get column widths 
+    widths_key = get_cache_key("widths", "*")
+    column_widths = cache_get(widths_key)
+
+    if column_widths is None:
+        month_rows = get_expense_rows_by_month(view_months)
+        column_widths = get_dict_column_widths([row for rows in month_rows.values() for row in rows], headers)
+        cache_put(widths_key, column_widths)
+
+    # print separator line
+    def print_separator():
+        separator_length = sum(column_widths) + len(column_widths) * 3 - 3  # width + spaces, less 3 char (5th | column separator)
+        print("-" * separator_length)
+
+    print("\n")
+    print_separator()
+
+    # print the header
+    print_aligned_row(headers, column_widths, headers)
+
+    print_separator()
+
+    for t_month in view_months:
+
+        block_key = get_cache_key("block", t_month, tuple(column_widths))
+        month_block = cache_get(block_key)
+
+        if month_block is None:
+
+            if month_rows is None:
+                month_rows = get_expense_rows_by_month(view_months)
+
+            # format each expense entry, aligned based on the column widths
+            month_block = [format_aligned_row(row, column_widths, headers) for row in month_rows.get(t_month, [])]
+            cache_put(block_key, month_block)
+
+        if month_block:
+            print("\n".join(month_block))
+
+    print_separator()
+
+    return True
+
+
+# live expense rows followed by the expanded recurring rows, grouped by YYYY-MM month, in one pass
+def get_expense_rows_by_month(t_months):
+
+    month_rows = {t_month: [] for t_month in t_months}
+
+    for row in iter_expense_rows():
+        month_rows.setdefault(row["Transaction Date"][:7], []).append(row)
+
+    for row in expand_recurring_expenses(t_months):
+        month_rows[row["Transaction Date"][:7]].append(row)
+
+    return month_rows
+
+
+# source of expense rows for sorted, top-N and export views: an expense.csv file or the loaded 'expense_entries'
+# file rows have the file's journal applied, like the loaded expenses
+# 'include_recurring' adds the recurring occurrences of the source's ledger from 'first_month' to 'last_month'
+def iter_expense_source(file_path=None, include_recurring=False, first_month=None, last_month=None):
+
+    if file_path:
+        rows = iter_journaled_file_rows(file_path)
+    else:
+        rows = iter_expense_rows()
+
+    if include_recurring:
+
+        name = get_source_ledger(file_path)
+
+        if name is None:
+            raise ValueError(f"'{file_path}' is not the expense file of a registered ledger")
+
+        rules = get_ledger_recurring_entries(name)
+        t_months = get_recurring_months(rules, get_ledger_month_totals(name), first_month, last_month)
+        rows = itertools.chain(rows, expand_recurring_expenses(t_months, rules))
+
+    return rows
+
+
+# ledger an expense source belongs to: the active ledger when no file is given, otherwise the registered
+# ledger with that expense file; None (with an error) for files of no registered ledger, their recurring rules are unknown
+def get_source_ledger(file_path=None):
+
+    if not file_path:
+        return active_ledger
+
+    file_path = os.path.abspath(os.path.expanduser(file_path))
+
+    for name, ledger in ledger_registry.items():
+
+        if os.path.abspath(ledger["Expense File"]) == file_path:
+            return name
+
+    print(f"Error: '{file_path}' is not the expense file of a registered ledger, its recurring expenses are unknown.")
+    return None
+
+
+# sort key for an expense sort field, ties are broken by transaction date
+def get_expense_sort_key(sort_by):
+
+    if sort_by == "amount":
+        return lambda row: (float(row["Amount"]), row["Transaction Date"])
+
+    if sort_by == "category":
+        return lambda row: (row["Category"], row["Transaction Date"])
+
+    return lambda row: row["Transaction Date"]
+
+
+# write a sorted chunk of expense rows to a temporary run file
+def write_sort_run(rows):
+
+    run_file = tempfile.TemporaryFile(mode='w+', newline='')
+    run_writer = csv.writer(run_file)
+
+    run_writer.writerows([row["Timestamp"], row["Transaction Date"], row["Amount"],
+                          row["Category"], row["Description"], row["ID"]] for row in rows)
+
+    run_file.seek(0)
+    return run_file
+
+
+# stream expense rows back from a temporary run file
+def read_sort_run(run_file):
+
+    for row in csv.reader(run_file):
+
+        yield {
+            "Timestamp": row[0],
+            "Transaction Date": row[1],
+            "Amount": float(row[2]),
+            "Category": row[3],
+            "Description": row[4],
+            "ID": row[5]
+        }
+
+
+# sorted view of the expenses by 'date', 'amount' or 'category'
+# data larger than 'memory_rows' is external merge sorted through temporary run files
+def iter_sorted_expenses(sort_by="date", descending=False, file_path=None, memory_rows=SORT_MEMORY_ROWS,
+                         include_recurring=False):
+
+    sort_key = get_expense_sort_key(sort_by)
+    source = iter_expense_source(file_path, include_recurring)
+
+    # one row over the budget tells whether everything fits
+    chunk = list(itertools.islice(source, memory_rows + 1))
+
+    # everything fits in the memory budget, sort in memory
+    if len(chunk) <= memory_rows:
+        chunk.sort(key=sort_key, reverse=descending)
+        yield from chunk
+        return
+
+    # the extra row starts the second run
+    overflow_row = chunk.pop()
+
+    run_files = []
+
+    try:
+
+        # phase 1: fill, sort and spill a single chunk of at most 'memory_rows' rows at a time
+        while chunk:
+            chunk.sort(key=sort_key, reverse=descending)
+            run_files.append(write_sort_run(chunk))
+
+            chunk.clear()
+
+            if overflow_row is not None:
+                chunk.append(overflow_row)
+                overflow_row = None
+
+            chunk.extend(itertools.islice(source, memory_rows - len(chunk)))
+
+        # phase 2: merge runs, in several passes if there are more runs than open files allowed
+        while len(run_files) > SORT_MERGE_FANIN:
+
+            merged_files = []
+
+            for n in range(0, len(run_files), SORT_MERGE_FANIN):
+
+                group = run_files[n:n + SORT_MERGE_FANIN]
+                merged_files.append(write_sort_run(
+                    heapq.merge(*(read_sort_run(f) for f in group), key=sort_key, reverse=descending)))
+
+                for run_file in group:
+                    run_file.close()
+
+            run_files = merged_files
+
+        yield from heapq.merge(*(read_sort_run(f) for f in run_files), key=sort_key, reverse=descending)
+
+    finally:
+        for run_file in run_files:
+            run_file.close()
+
+
+# the 'n' largest (or smallest) expenses by amount
+# one streaming pass with a heap bounded to 'n' rows
+def get_top_expenses(n=20, largest=True, file_path=None, include_recurring=False):
+
+    sort_key = get_expense_sort_key("amount")
+    source = iter_expense_source(file_path, include_recurring)
+
+    if largest:
+        return heapq.nlargest(n, source, key=sort_key)
+
+    return heapq.nsmallest(n, source, key=sort_key)
+
+
+# print streamed expense rows with fixed column widths, the rows are never held in memory together
+def print_expense_stream(rows):
+
+    headers = ["Timestamp", "Transaction Date", "Amount", "Category", "Description", "ID"]
+    separator_length = sum(STREAM_COLUMN_WIDTHS) + len(STREAM_COLUMN_WIDTHS) * 3 - 3
+
+    print("\n")
+    print("-" * separator_length)
+    print_aligned_row(dict(zip(headers, headers)), STREAM_COLUMN_WIDTHS, headers)
+    print("-" * separator_length)
+
+    row_count = 0
+    for row in rows:
+        print_aligned_row(row, STREAM_COLUMN_WIDTHS, headers)
+        row_count += 1
+
+    print("-" * separator_length)
+    print(f"{row_count} expense(s)")
+
+    return row_count
+
+
+# prompt for an optional expense.csv path, empty uses the loaded expenses
+def prompt_ledger_file():
+
+    file_path = input("Enter an expense file path (optional, default is the loaded expenses): ").strip()
+
+    if file_path and not os.path.isfile(file_path):
+        print(f"Error: The file '{file_path}' does not exist.")
+        return None
+
+    return file_path
+
+
+# user interface for a sorted expense view
+def view_sorted_expenses():
+
+    sort_by = input("Sort by (date, amount, category): ").strip().lower()
+
+    if sort_by not in ("date", "amount", "category"):
+        print(f"Error: '{sort_by}' is an invalid sort field.")
+        return False
+
+    descending = input("Descending order? (y/n): ").strip().lower() == 'y'
+
+    file_path = prompt_ledger_file()
+
+    if file_path is None:
+        return False
+
+    include_recurring = input("Include recurring expenses? (y/n): ").strip().lower() == 'y'
+
+    if include_recurring and get_source_ledger(file_path) is None:
+        return False
+
+    try:
+        print_expense_stream(iter_sorted_expenses(sort_by, descending, file_path,
+                                                  include_recurring=include_recurring))
+
+    except PermissionError:
+        print(f"Error: You do not have permission to read '{file_path}'.")
+        return False
+
+    except Exception as err:
+        print(f"Error while sorting the expenses: {err}")
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+# user interface for the largest/smallest N expenses
+def view_top_expenses():
+
+    t_count = input("How many expenses? (default 20): ").strip() or "20"
+
+    if not t_count.isdigit() or int(t_count) == 0:
+        print(f"Error: '{t_count}' is an invalid number of expenses.")
+        return False
+
+    largest = input("Largest or smallest? (l/s): ").strip().lower() != 's'
+
+    file_path = prompt_ledger_file()
+
+    if file_path is None:
+        return False
+
+    include_recurring = input("Include recurring expenses? (y/n): ").strip().lower() == 'y'
+
+    if include_recurring and get_source_ledger(file_path) is None:
+        return False
+
+    try:
+        print_expense_stream(get_top_expenses(int(t_count), largest, file_path, include_recurring))
+
+    except PermissionError:
+        print(f"Error: You do not have permission to read '{file_path}'.")
+        return False
+
+    except Exception as err:
+        print(f"Error while selecting the expenses: {err}")
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+# get expense_entries column widths
+def get_dict_column_widths(rows, headers):
+    column_widths = []
+    
+    for header in headers:
+        
+        # find the max width for this column (header + any row values)
+        max_width = max(len(str(header)), max((len(str(row.get(header, ''))) for row in rows), default=0))
+        column_widths.append(max_width)
+    
+    return column_widths
+
+
+# print rows with alignment based on column widths
+def print_aligned_row(row, column_widths, headers):
+
+    # ensure the row has the correct number of values
+    # 'zip()'  https://docs.python.org/3.3/library/functions.html
+    # 'str()', 'ljust()'  https://docs.python.org/3/library/stdtypes.html#textseq
+
+    print(format_aligned_row(row, column_widths, headers))
+
+
+# format a row with alignment based on column widths
+def format_aligned_row(row, column_widths, headers):
+
+    return " | ".join(f"{str(row.get(header, '')).ljust(width)}" 
+                      for header, width in zip(headers, column_widths))
+
+
+# set month's budget allocation 
+def set_month_budget():
+
+    global budget_entries
+
+    cntr = 0
+    while True:
+
+        month_budget_date = input("\nEnter month YYYY-MM : ")
+
+        if validate_month_format(month_budget_date):
+            break
+        else:
+            print(f"Invalid month date format {month_budget_date}. Please use YYYY-MM format\n")
+            cntr += 1
+            if cntr >= 3:
+                print(f"Max '{cntr}' date entry try exceeded, exiting 'Add month budget'.")
+                return False
+
+    cntr = 0
+    while True:
+
+        month_budget_amount = input("\nEnter budget allocation amount : ")
+
+        if validate_amount(month_budget_amount):
+            break
+
+        else:    
+            print(f"Invalid amount format {month_budget_amount}.\n")
+            cntr += 1
+            if cntr >= 3:
+                print(f"Max '{cntr}' amount entry try exceeded, exiting 'Add month budget'.")
+                return False
+
+    # get current year and month
+    c_date = datetime.now() 
+    o_date = c_date.strftime(MONTH_FORMAT)
+    month_name = c_date.strftime("%B")
+
+    month_budget_Description = input("\nEnter budget description (optional) : ")
+
+    if month_budget_Description == "":
+        
+        month_budget_Description = f"{month_name} budget allocation"
+
+
+    budget_dict = {
+        "Timestamp": c_date,
+        "Month": month_name,
+        "Date": month_budget_date,
+        "Amount": month_budget_amount,
+        "Description": month_budget_Description
+    }
+
+    # use of 'copy' to avoid potentially/accidentally modifying 'budget_entries' dictionary entry 
+    if len(budget_entries) > 1: 
+
+        # set (override) the current budget dictionary entry in the global list
+        # skip budget[0] it's the header
+        budget_entries[1] = budget_dict.copy()
+    
+    else:
+        
+        # initialize 'budget_entries' global list
+        if not budget_entries:
+
+            # add new budget entry
+            budget_entries.append(budget_dict.copy())
+        
+    # the budget allocation is part of every month's report
+    invalidate_cache_kind("report")
+
+    # save budget information to csv file
+    save_budget_to_file(BUDGET_FILE)
+    print(f"\n*** Budget information is saved in {BUDGET_FILE} file by default ***\n")
+    return True
+
+
+# validate month format YYYY-MM 
+def validate_month_format(b_month):
+    
+    # ensure the input is a string (convert to string if it's not)
+    if not isinstance(b_month, str):
+        b_month = str(b_month)
+
+    # clean input and check for empty string or None
+    c_month = b_month.strip() if b_month else ""
+
+    # check if the cleaned input is empty (after stripping spaces)
+    if not c_month:
+        print("Error: The month input is empty. Please provide a valid month in YYYY-MM format.")
+        return False
+
+    try:
+        # parse the date using the expected format
+        datetime.strptime(c_month, MONTH_FORMAT)
+
+        # month is valid
+        return True
+
+    except ValueError:
+        print(f"Error: The month '{b_month}' is invalid. Please use the YYYY-MM format.")
+        traceback.print_exc()
+        return False
+        
+
+# save global list 'budget_entries' to budget.csv file
+def save_budget_to_file(file_path=None):
+
+    if not budget_entries:
+        print("No budget to save.")
+        return None
+    
     # default to global BUDGET_FILE if no path is provided
     file_path = file_path or BUDGET_FILE
 
-    try:
-        
-        # check if the file already exists
-        file_exists = os.path.exists(file_path)
+    try:
+        
+        # check if the file already exists
+        file_exists = os.path.exists(file_path)
+
+        with open(file_path, 'w', newline='') as file:
+
+            # fieldnames from the keys of the first dictionary in expense_entries
+            fieldnames = list(budget_entries[0].keys())
+
+            budget_writer = csv.DictWriter(file, fieldnames=fieldnames)
+
+            # add header only if file doesn't 
+            if not file_exists:
+                budget_writer.writeheader()
+            
+            # write the expense entries; skip header budget_entries[0]
+            budget_writer.writerows(budget_entries)
+            print(f"Budget saved to {file_path}")
+            
+    except FileNotFoundError:
+        print(f"Error: The file path '{file_path}' could not be found.")
+        return None
+    
+    except PermissionError:
+        print(f"Error: You do not have permission to write to '{file_path}'.")
+        return None
+
+    except IsADirectoryError:
+        print(f"Error: The path '{file_path}' is a directory, not a file.")
+        return None
+
+    except Exception as err:
+        print(f"Error while creating/appending the file: {err}")
+        traceback.print_exc()
+        return None
+
+
+# user interface to track month's expenses
+# month argument expects YYYY-MM format
+def track_budget(b_month = None):
+
+    if b_month is not None:
+
+        if not validate_month_format(b_month):
+
+            cntr = 0
+            while True:
+
+                #get user input
+                b_month = input("\nPlease enter transaction month YYYY-MM : ")
+                b_month = b_month.strip()  # clean up date input
+                #b_month.strftime(MONTH_FORMAT)
+            
+                if validate_month_format(b_month):
+                    break
+
+                else:
+                    print(f"\nInvalid month format {b_month}, please use YYYY-MM.")
+                    cntr += 1
+                    if cntr >= 3:
+                        print(f"Warning: Max retry exceeded, exiting track_budget...")
+                        return False 
+
+    else:
+    
+        b_month = CURRENT_MONTH_DATE
+     
+    if not budget_entries:
+        print(f"Error: No budget allocation for the month of {CURRENT_MONTH_NAME} is defined")
+        return False
+
+    try:
+
+        # a month with no spending returns a 0.0 total, only 'False' is a failure
+        if view_running_month_expenses(b_month) is False:
+            # handle expected valication return 'False' explicitly
+            return False
+
+        if np is not None:
+            print_month_forecast(b_month)
+
+        else:
+            print("Info: Install NumPy to see the month-end forecast.")
+
+    except ValueError:
+        print(f"Error: The month '{b_month}' is invalid. Please use the YYYY-MM format.")
+        traceback.print_exc()
+        return False
+        
+    return True
+
+
+# display month running expenses from global 'expense_entries' list ( of dictionaries )
+def view_running_month_expenses(t_month):
+
+    # an empty 'expense_entries' is still reported, recurring occurrences may make up the month
+    if not validate_month_format(t_month):
+        return False
+    
+    # format input date for consistency
+    c_month = t_month.strip()  # clean up date input
+    o_date = datetime.strptime(c_month, MONTH_FORMAT) # convert to datetime object
+    f_date = o_date.strftime(MONTH_FORMAT)  # formatted date
+    month_name = o_date.strftime("%B") 
+
+    # note 'budget_entries[0]' is the header, skip
+    if not budget_entries:
+        print(f"Budget is not loaded, please load month's budget first")
+        return False
+    
+    month_budget_allocation = float(budget_entries[1]["Amount"])
+
+    # the budget allocation is part of the key, a budget change never serves a stale report
+    report_key = get_cache_key("report", f_date, month_budget_allocation)
+    month_report = cache_get(report_key)
+
+    if month_report is None:
+
+        running_month_expenses, transaction_count, recurring_month_expenses, recurring_count = get_month_total(f_date)
+
+        report_lines = [
+            f"\n{'-' * 40}",
+            f"\n   Expenses for the month of {month_name}",
+            f"\n{'-' * 40}",
+            f"\nRunning total: ${running_month_expenses}",
+            f"Total number of transactions: {transaction_count}"
+        ]
+        if recurring_count:
+            report_lines.append(f"Recurring expenses included: ${recurring_month_expenses} ({recurring_count} occurrences)")
+        report_lines.append(f"This month's budget allocation: ${month_budget_allocation} \n")
+        if running_month_expenses <= month_budget_allocation:
+            report_lines.append(f"You have ${month_budget_allocation - running_month_expenses} left for this month.\n") 
+            report_lines.append(f" {'-' * 40}\n")
+
+        elif running_month_expenses > month_budget_allocation:
+            report_lines.append(f"You have exceeded your month of {month_name} budget by ${month_budget_allocation - running_month_expenses}.\n") 
+            report_lines.append(f" {'-' * 40}\n")
+
+        month_report = (running_month_expenses, report_lines)
+        cache_put(report_key, month_report)
+
+    print("\n".join(month_report[1]))
+
+    return month_report[0]
+
+
+# month total and transaction count, ledger expenses plus recurring occurrences
+# returns (total, count, recurring total, recurring count)
+def get_month_total(t_month):
+
+    total_key = get_cache_key("month_total", t_month)
+    month_total = cache_get(total_key)
+
+    if month_total is None:
+
+        # month aggregates are kept up to date by add/edit/delete, no scan needed
+        running_month_expenses, transaction_count = month_totals.get(t_month, [0.0, 0])
+
+        # recurring rules contribute arithmetically, no rows are materialized
+        recurring_month_expenses, recurring_count = get_recurring_month_total(t_month)
+
+        month_total = (round(running_month_expenses + recurring_month_expenses, 2),
+                       transaction_count + recurring_count,
+                       recurring_month_expenses,
+                       recurring_count)
+        cache_put(total_key, month_total)
+
+    return month_total
+
+
+# month-end spend forecast and per-category trend slopes for a YYYY-MM month
+# 'as_of_day' defaults to today for the current month, the month end for past months, 0 for future months
+# returns a dictionary, or None when NumPy is not installed or the month is invalid
+def forecast_month_expenses(t_month, as_of_day=None):
+
+    if np is None:
+        print("Error: Forecasting requires NumPy, please install it (pip install numpy).")
+        return None
+
+    if not validate_month_format(t_month):
+        return None
+
+    t_month = t_month.strip()
+    days_in_month = get_month_bounds(t_month)[1].day
+
+    if as_of_day is None:
+
+        if t_month == CURRENT_MONTH_DATE:
+            as_of_day = datetime.now().day
+
+        elif t_month < CURRENT_MONTH_DATE:
+            as_of_day = days_in_month
+
+        else:
+            as_of_day = 0
+
+    as_of_day = min(max(int(as_of_day), 0), days_in_month)
+
+    # depends on the whole history, cached under the cross-month scope
+    forecast_key = get_cache_key("forecast", "*", t_month, as_of_day)
+    forecast = cache_get(forecast_key)
+
+    if forecast is None:
+        forecast = compute_month_forecast(t_month, as_of_day, days_in_month)
+        cache_put(forecast_key, forecast)
+
+    return forecast
+
+
+# daily and per-category monthly spend of the whole ledger as NumPy arrays, built in one pass
+# returns (first month, daily[month, day], category names, category_month[category, month]) or None if empty
+def get_expense_history_arrays():
+
+    history_key = get_cache_key("history", "*")
+    history = cache_get(history_key)
+
+    if history is not None:
+        return history
+
+    expense_rows = list(iter_expense_rows())
+
+    if not expense_rows:
+        return None
+
+    dates = np.array([row["Transaction Date"] for row in expense_rows], dtype="datetime64[D]")
+    amounts = np.array([float(row["Amount"]) for row in expense_rows])
+    category_names, category_codes = np.unique([row["Category"] for row in expense_rows], return_inverse=True)
+
+    months = dates.astype("datetime64[M]")
+    first_month = months.min()
+
+    # 0-based month index since the first month, and 0-based day of month
+    month_index = (months - first_month).astype(np.int64)
+    day_index = (dates - months.astype("datetime64[D]")).astype(np.int64)
+    month_count = int(month_index.max()) + 1
+
+    daily = np.bincount(month_index * 31 + day_index, weights=amounts,
+                        minlength=month_count * 31).reshape(month_count, 31)
+
+    category_month = np.bincount(category_codes.ravel() * month_count + month_index, weights=amounts,
+                                 minlength=len(category_names) * month_count).reshape(len(category_names), month_count)
+
+    history = (first_month, daily, category_names, category_month)
+    cache_put(history_key, history)
+
+    return history
+
+
+# projections for a month from the ledger history; recurring occurrences are known in advance and added exactly
+def compute_month_forecast(t_month, as_of_day, days_in_month):
+
+    recurring_total, recurring_count = get_recurring_month_total(t_month)
+    recurring_to_date = round(sum(round(float(rule["Amount"]), 2)
+                                  for rule in recurring_entries[1:]
+                                  for r_date in get_recurring_dates(rule, t_month)
+                                  if r_date.day <= as_of_day), 2)
+
+    spent = 0.0
+    linear_projection = None
+    historical_projection = None
+    category_trends = {}
+    trend_months = 0
+
+    history = get_expense_history_arrays()
+
+    if history is not None:
+
+        first_month, daily, category_names, category_month = history
+        month_count = daily.shape[0]
+
+        target_index = int((np.datetime64(t_month, "M") - first_month).astype(np.int64))
+        past_count = min(max(target_index, 0), month_count)
+
+        # cumulative spend by day of month, every month at once
+        cumulative = daily.cumsum(axis=1)
+        month_end_totals = cumulative[:, -1]
+
+        if 0 <= target_index < month_count and as_of_day:
+            spent = float(cumulative[target_index, as_of_day - 1])
+
+        # daily burn so far, extended to the month end
+        if as_of_day:
+            linear_projection = spent / as_of_day * days_in_month
+
+        # past months' share of their month-end total reached by the same day of month
+        past_totals = month_end_totals[:past_count]
+        spending_months = past_totals > 0
+
+        if spending_months.any():
+
+            if not as_of_day:
+                historical_projection = float(np.median(past_totals[spending_months]))
+
+            else:
+                day_shares = cumulative[:past_count, as_of_day - 1][spending_months] / past_totals[spending_months]
+                median_share = float(np.median(day_shares))
+
+                historical_projection = spent / median_share if median_share > 0 else linear_projection
+
+        # least squares slope of each category's monthly spend over the last months before this one
+        trend_window = category_month[:, max(past_count - FORECAST_TREND_MONTHS, 0):past_count]
+        trend_months = trend_window.shape[1]
+
+        if trend_months >= 2:
+
+            x = np.arange(trend_months) - (trend_months - 1) / 2.0
+            slopes = (trend_window - trend_window.mean(axis=1, keepdims=True)) @ x / (x @ x)
+
+            category_trends = {str(name): round(float(slope), 2) for name, slope in zip(category_names, slopes)}
+
+    # month is over, nothing left to project
+    if as_of_day == days_in_month:
+        linear_projection = historical_projection = spent
+
+    def with_recurring(projection):
+        return None if projection is None else round(projection + recurring_total, 2)
+
+    return {
+        "Month": t_month,
+        "Day": as_of_day,
+        "Days In Month": days_in_month,
+        "Spent": round(spent + recurring_to_date, 2),
+        "Recurring": recurring_total,
+        "Linear Projection": with_recurring(linear_projection),
+        "Historical Projection": with_recurring(historical_projection),
+        "Category Trends": category_trends,
+        "Trend Months": trend_months
+    }
+
+
+# print the month-end forecast against the month's budget allocation
+def print_month_forecast(t_month):
+
+    forecast = forecast_month_expenses(t_month)
+
+    if forecast is None:
+        return False
+
+    month_name = datetime.strptime(forecast["Month"], MONTH_FORMAT).strftime("%B")
+
+    print(f"\n   Month-end forecast for {month_name} (day {forecast['Day']} of {forecast['Days In Month']})\n")
+    print(f"Spent so far: ${forecast['Spent']}")
+
+    if forecast["Linear Projection"] is not None:
+        print(f"Projected at the current daily burn: ${forecast['Linear Projection']}")
+
+    if forecast["Historical Projection"] is not None:
+        print(f"Projected from past months at the same day: ${forecast['Historical Projection']}")
+
+    # note 'budget_entries[0]' is the header, skip
+    projection = forecast["Historical Projection"] or forecast["Linear Projection"]
+
+    if projection is not None and len(budget_entries) > 1:
+
+        month_budget_allocation = float(budget_entries[1]["Amount"])
+
+        if projection > month_budget_allocation:
+            print(f"Warning: Projected to exceed the budget by ${round(projection - month_budget_allocation, 2)}.")
+        else:
+            print(f"Projected to stay ${round(month_budget_allocation - projection, 2)} under budget.")
+
+    if forecast["Category Trends"]:
+
+        print(f"\nCategory trends over the last {forecast['Trend Months']} months (change per month):")
+
+        for category, slope in sorted(forecast["Category Trends"].items(), key=lambda item: -item[1]):
+            trend = "up" if slope > 0 else "down" if slope < 0 else "flat"
+            print(f"  {category.ljust(15)} {slope:+10.2f}  {trend}")
+
+    print(f"\n {'-' * 40}\n")
+
+    return True
+
+
+# read budget.csv and populate global list 'budget_entries' 
+# malformed rows are moved to the quarantine file
+def load_budget(file_path=None):
+
+    global budget_entries
+
+    # clear stale entries
+
+    budget_entries = []
+
+    # default to the global constant BUDGET_FILE if no path is provided
+    file_path = file_path or BUDGET_FILE
+
+    quarantine_rows = []
+
+    try:
+
+        if not os.path.exists(file_path):
+            print(f"Error: The file '{file_path}' does not exist.")        
+            return False
+    
+        with open(file_path, 'r', newline='') as file:
+            budget_reader = csv.reader(file)
+
+            first_row = next(budget_reader, None)
+            rows = budget_reader
+
+            # a file without header starts with data
+            if first_row is not None and not is_header_row(first_row, BUDGET_HEADER):
+                rows = itertools.chain([first_row], budget_reader)
+
+            # the header is always budget_entries[0]
+            budget_entries.append(dict(zip(BUDGET_HEADER, BUDGET_HEADER)))
+
+            # iterate over the rows
+            for row in rows:
+                
+                # budget entry has atleast 4 columns, 5th column (Description is optional)
+                if len(row) < 4 or len(row) > 5:
+                    quarantine_rows.append((budget_reader.line_num, f"expected 4 or 5 columns, got {len(row)}", row))
+                    continue
+
+                try:
+                    b_date = datetime.strptime(row[2].strip(), MONTH_FORMAT).strftime(MONTH_FORMAT)
+                    b_amount = float(row[3])
+
+                except ValueError:
+                    b_date, b_amount = None, -1.0
+
+                if b_date is None or not (b_amount >= 0 and math.isfinite(b_amount)):
+                    quarantine_rows.append((budget_reader.line_num, f"invalid month '{row[2]}' or amount '{row[3]}'", row))
+                    continue
+
+                # create the budget dictionary
+                budget_dict = {
+                    "Timestamp": row[0],
+                    "Month": row[1],
+                    "Date": b_date,
+                    "Amount": b_amount,
+                    "Description": row[4] if len(row) > 4 else ""
+                }
+    
+                # add the budget to the global list
+                budget_entries.append(budget_dict)
+
+        # header only, no budget allocated
+        if len(budget_entries) < 2:
+            budget_entries = []
+
+        invalidate_cache_kind("report")
+
+        save_quarantine_rows(file_path, quarantine_rows)
+        return True
+    
+    except FileNotFoundError:
+        print(f"Error: The file path '{file_path}' could not be found.")
+        return False
+    
+    except PermissionError:
+        print(f"Error: You do not have permission to write to '{file_path}'.")
+        return False
+
+    except IsADirectoryError:
+        print(f"Error: The path '{file_path}' is a directory, not a file.")
+        return False
+
+    except Exception as err:
+        print(f"Error while reading the '{file_path}' file: {err}")
+        traceback.print_exc()
+        return False
+
+
+# user interface for adding recurring expense rule(s), e.g. rent, subscriptions, utilities
+def add_recurring_expenses():
+
+    while True:
+
+        cntr = 0
+        while True:
+
+            r_start = input("Enter the first occurrence date (YYYY-MM-DD): ")
+
+            if validate_date(r_start):
+                break
+
+            print("Please try again.")
+
+            cntr += 1
+            if cntr > 3:
+                print(f"Max try exceeded, exiting 'Add recurring expenses'")
+                return False
+
+        cntr = 0
+        while True:
+
+            r_end = input("Enter the last occurrence date (YYYY-MM-DD, optional): ").strip()
+
+            if r_end == "" or validate_date(r_end):
+                break
+
+            print("Please try again.")
+
+            cntr += 1
+            if cntr > 3:
+                print(f"Max try exceeded, exiting 'Add recurring expenses'")
+                return False
+
+        cntr = 0
+        while True:
+
+            r_cadence = input("Enter the cadence (DAILY, WEEKLY, MONTHLY, YEARLY): ")
+
+            if validate_cadence(r_cadence):
+                break
+
+            print("Please try again.")
+
+            cntr += 1
+            if cntr > 3:
+                print(f"Max try exceeded, exiting 'Add recurring expenses'")
+                return False
+
+        cntr = 0
+        while True:
+
+            r_category = input(f"Enter the category (e.g., {get_category_prompt()}): ")
+
+            if validate_category(r_category):
+                break
+
+            print("Please try again.")
+
+            cntr += 1
+            if cntr > 3:
+                print(f"Max try exceeded, exiting 'Add recurring expenses'")
+                return False
+
+        cntr = 0
+        while True:
+
+            r_amount = input("Enter the amount: ")
+
+            if validate_amount(r_amount):
+                r_amount = round(float(r_amount), 2)
+                break
+
+            print("Please try again.")
+
+            cntr += 1
+            if cntr > 3:
+                print(f"Max try exceeded, exiting 'Add recurring expenses'")
+                return False
+
+        r_description = input("Enter a description (optional): ")
+
+        if r_description == "":
+            r_description = f"{r_cadence.strip().capitalize()} expense"
+
+        # add recurring rule to the list
+        if not add_recurring_entry(r_start, r_cadence, r_category, r_amount, r_description, r_end):
+            return False
+
+        # if the user wants to add another recurring expense
+        more_rules = input("Do you want to add another recurring expense? (y/n): ").strip().lower()
+
+        if more_rules != 'y':
+            break
+
+    # save recurring rules to csv file
+    save_recurring_to_file(RECURRING_FILE)
+    return True
+
+
+# add a recurring expense rule to global list 'recurring_entries'
+# only the rule is stored, occurrences are expanded on the fly per queried month
+def add_recurring_entry(r_start, r_cadence, r_category, r_amount, r_description="", r_end=""):
+
+    # validate entry arguments
+    if not validate_date(r_start):
+        print("Invalid start date format. Please enter a valid date (YYYY-MM-DD).")
+        return False
+
+    if r_end and not validate_date(r_end):
+        print("Invalid end date format. Please enter a valid date (YYYY-MM-DD).")
+        return False
+
+    # normalized, e.g. 2024-3-7 -> 2024-03-07, the dates compare as text and month keys are sliced from them
+    r_start = datetime.strptime(r_start.strip(), DATE_FORMAT).strftime(DATE_FORMAT)
+    r_end = datetime.strptime(r_end.strip(), DATE_FORMAT).strftime(DATE_FORMAT) if r_end else ""
+
+    if r_end and r_end < r_start:
+        print(f"Invalid end date '{r_end}', it is before the start date '{r_start}'.")
+        return False
+
+    if not validate_cadence(r_cadence):
+        print("Invalid cadence. Please enter a valid cadence.")
+        return False
+
+    if not validate_category(r_category):
+        print("Invalid category. Please enter a valid category.")
+        return False
+
+    if not validate_amount(r_amount):
+        print("Invalid amount. Please enter a valid amount (greater than 0).")
+        return False
+
+    recurring_dict = {
+        "Timestamp": datetime.now().strftime(DATE_TIME_FORMAT),
+        "Start Date": r_start,
+        "End Date": r_end,
+        "Cadence": r_cadence.strip().lower(),
+        "Amount": float(r_amount),
+        "Category": intern_category(r_category),
+        "Description": r_description
+    }
+
+    # very first rule, add header first
+    if not recurring_entries:
+        recurring_entries.append(dict(zip(RECURRING_HEADER, RECURRING_HEADER)))
+
+    recurring_entries.append(recurring_dict)
+    invalidate_recurring_cache(recurring_dict["Start Date"], recurring_dict["End Date"])
+    return True
+
+
+# validate the recurring cadence
+def validate_cadence(r_cadence):
+
+    if isinstance(r_cadence, str) and r_cadence.strip().upper() in VALID_CADENCES:
+        return True
+
+    print(f"Error: {r_cadence} is an invalid cadence value. Please use one of: {', '.join(VALID_CADENCES)}")
+    return False
+
+
+# first and last day of a YYYY-MM month
+def get_month_bounds(t_month):
+
+    o_date = datetime.strptime(t_month.strip(), MONTH_FORMAT)
+    last_day = calendar.monthrange(o_date.year, o_date.month)[1]
+
+    return o_date.date(), o_date.date().replace(day=last_day)
+
+
+# occurrence window of a recurring rule within a month
+# returns (start date, lo, hi), with lo > hi when the rule has no occurrence in the month
+def get_recurring_window(rule, t_month):
+
+    m_start, m_end = get_month_bounds(t_month)
+    r_start = datetime.strptime(rule["Start Date"], DATE_FORMAT).date()
+
+    lo = max(m_start, r_start)
+    hi = m_end
+
+    if rule["End Date"]:
+        hi = min(hi, datetime.strptime(rule["End Date"], DATE_FORMAT).date())
+
+    return r_start, lo, hi
+
+
+# day-of-month occurrence of a monthly/yearly rule, clamped to short months (e.g. 31st -> Feb 28th)
+def get_recurring_day(r_start, lo):
+
+    last_day = calendar.monthrange(lo.year, lo.month)[1]
+    return lo.replace(day=min(r_start.day, last_day))
+
+
+# number of occurrences of a recurring rule in a month
+# computed arithmetically, O(1) regardless of how long the rule has been running
+def count_recurring_occurrences(rule, t_month):
+
+    r_start, lo, hi = get_recurring_window(rule, t_month)
+
+    if lo > hi:
+        return 0
+
+    cadence = rule["Cadence"].upper()
+
+    if cadence == "DAILY":
+        return (hi - lo).days + 1
+
+    if cadence == "WEEKLY":
+        # occurrences are r_start + 7k, count the k values falling in [lo, hi]
+        first_k = -(-(lo - r_start).days // 7)
+        last_k = (hi - r_start).days // 7
+        return max(0, last_k - first_k + 1)
+
+    if cadence == "YEARLY" and lo.month != r_start.month:
+        return 0
+
+    # MONTHLY and YEARLY, a single occurrence on the rule's day of month
+    r_day = get_recurring_day(r_start, lo)
+    return 1 if lo <= r_day <= hi else 0
+
+
+# occurrence dates of a recurring rule in a month, only used when rows must be displayed
+def get_recurring_dates(rule, t_month):
+
+    count = count_recurring_occurrences(rule, t_month)
+
+    if not count:
+        return []
+
+    r_start, lo, hi = get_recurring_window(rule, t_month)
+    cadence = rule["Cadence"].upper()
+
+    if cadence == "DAILY":
+        return [lo + timedelta(days=n) for n in range(count)]
+
+    if cadence == "WEEKLY":
+        first_k = -(-(lo - r_start).days // 7)
+        return [r_start + timedelta(days=7 * (first_k + n)) for n in range(count)]
+
+    return [get_recurring_day(r_start, lo)]
+
+
+# total amount and number of recurring occurrences in a month, without expanding any rows
+# 'rules' defaults to the active ledger's 'recurring_entries'
+def get_recurring_month_total(t_month, rules=None):
+
+    if rules is None:
+        rules = recurring_entries
+
+    month_total = 0.0
+    occurrence_count = 0
+
+    # note 'rules[0]' is the header, skip
+    for rule in rules[1:]:
+
+        count = count_recurring_occurrences(rule, t_month)
+
+        if count:
+            occurrence_count += count
+            month_total += count * round(float(rule["Amount"]), 2)
+
+    return round(month_total, 2), occurrence_count
+
+
+# expand recurring rules into expense dictionaries for the given month(s)
+# 'rules' defaults to the active ledger's 'recurring_entries'
+def expand_recurring_expenses(t_months, rules=None):
+
+    if rules is None:
+        rules = recurring_entries
+
+    for t_month in t_months:
+
+        for rule in rules[1:]:
+
+            for r_date in get_recurring_dates(rule, t_month):
+
+                yield {
+                    "Timestamp": rule["Timestamp"],
+                    "Transaction Date": r_date.strftime(DATE_FORMAT),
+                    "Amount": float(rule["Amount"]),
+                    "Category": rule["Category"],
+                    "Description": f"{rule['Description']} (recurring)",
+                    "ID": ""
+                }
+
+
+# months to expand recurring rules over; open ends default to the ledger's span, from the first
+# expense or rule start month to the last expense month or the current month, whichever is later
+def get_recurring_months(rules, ledger_month_totals, first_month=None, last_month=None):
+
+    # note 'rules[0]' is the header, no rules means no months
+    if len(rules) < 2:
+        return []
+
+    if first_month is None:
+        first_month = min(list(ledger_month_totals) + [rule["Start Date"][:7] for rule in rules[1:]])
+
+    if last_month is None:
+        last_month = max(list(ledger_month_totals) + [CURRENT_MONTH_DATE])
+
+    return list(get_month_range(first_month, last_month))
+
+
+# YYYY-MM months from first_month to last_month inclusive
+def get_month_range(first_month, last_month):
+
+    year, month = int(first_month[:4]), int(first_month[5:7])
+
+    while f"{year:04d}-{month:02d}" <= last_month:
+
+        yield f"{year:04d}-{month:02d}"
+
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+# read recurring.csv and populate global list 'recurring_entries'
+def load_recurring(file_path=None):
+
+    global recurring_entries
+
+    # clear stale entries
+    recurring_entries = []
+
+    # default to the global constant RECURRING_FILE if no path is provided
+    file_path = file_path or RECURRING_FILE
+
+    try:
+
+        if not os.path.exists(file_path):
+            print(f"Info: No recurring expenses file '{file_path}' found.")
+            return False
+
+        quarantine_rows = []
+        recurring_entries = read_recurring_file(file_path, quarantine_rows)
+
+        save_quarantine_rows(file_path, quarantine_rows)
+        return True
+
+    except PermissionError:
+        print(f"Error: You do not have permission to read '{file_path}'.")
+        return False
+
+    except IsADirectoryError:
+        print(f"Error: The path '{file_path}' is a directory, not a file.")
+        return False
+
+    except Exception as err:
+        print(f"Error while reading the '{file_path}' file: {err}")
+        traceback.print_exc()
+        return False
+
+
+# read the recurring rules of a recurring.csv file into a new list, header dictionary first
+# used for the active ledger and, by the rollup, for ledgers that are not loaded
+# the header is checked once; malformed rows are appended to 'quarantine_rows' as (line, reason, row), when given
+def read_recurring_file(file_path, quarantine_rows=None):
+
+    rules = []
+
+    with open(file_path, 'r', newline='') as file:
+        recurring_reader = csv.reader(file)
+
+        first_row = next(recurring_reader, None)
+
+        if first_row is None:
+            return rules
+
+        rows = recurring_reader
+
+        # a file without header starts with data
+        if not is_header_row(first_row, RECURRING_HEADER):
+            rows = itertools.chain([first_row], recurring_reader)
+
+        for row in rows:
+
+            # recurring entry has 7 columns, 'End Date' may be empty
+            if len(row) != 7:
+                if quarantine_rows is not None:
+                    quarantine_rows.append((recurring_reader.line_num, f"expected 7 columns, got {len(row)}", row))
+                continue
+
+            timestamp, r_start, r_end, r_cadence, r_amount, r_category, r_description = row
+
+            try:
+                # normalized, e.g. 2024-3-7 -> 2024-03-07, occurrences are computed from these dates
+                r_start = datetime.strptime(r_start.strip(), DATE_FORMAT).strftime(DATE_FORMAT)
+
+            except ValueError:
+                if quarantine_rows is not None:
+                    quarantine_rows.append((recurring_reader.line_num, f"invalid start date '{r_start}'", row))
+                continue
+
+            try:
+                r_end = datetime.strptime(r_end.strip(), DATE_FORMAT).strftime(DATE_FORMAT) if r_end.strip() else ""
+
+            except ValueError:
+                if quarantine_rows is not None:
+                    quarantine_rows.append((recurring_reader.line_num, f"invalid end date '{r_end}'", row))
+                continue
+
+            try:
+                f_amount = float(r_amount)
+
+            except ValueError:
+                f_amount = -1.0
+
+            # an unknown cadence must not be read as MONTHLY, nor an end date before the start
+            if r_cadence.strip().upper() not in VALID_CADENCES:
+                reason = f"invalid cadence '{r_cadence}'"
+
+            elif r_end and r_end < r_start:
+                reason = f"end date '{r_end}' is before the start date '{r_start}'"
+
+            # also rejects 'nan' and 'inf'
+            elif not (f_amount >= 0 and math.isfinite(f_amount)):
+                reason = f"invalid amount '{r_amount}'"
+
+            elif not r_category.strip():
+                reason = "empty category"
+
+            else:
+                reason = None
+
+            if reason is not None:
+                if quarantine_rows is not None:
+                    quarantine_rows.append((recurring_reader.line_num, reason, row))
+                continue
+
+            # the header is always rules[0]
+            if not rules:
+                rules.append(dict(zip(RECURRING_HEADER, RECURRING_HEADER)))
+
+            rules.append({
+                "Timestamp": timestamp,
+                "Start Date": r_start,
+                "End Date": r_end,
+                "Cadence": r_cadence.strip().lower(),
+                "Amount": f_amount,
+                "Category": intern_category(r_category),
+                "Description": r_description
+            })
+
+    return rules
+
+
+# save global list 'recurring_entries' to recurring.csv file
+def save_recurring_to_file(file_path=None):
+
+    if not recurring_entries:
+        print("No recurring expenses to save.")
+        return None
+
+    # default to global RECURRING_FILE if no path is provided
+    file_path = file_path or RECURRING_FILE
+
+    try:
+
+        with open(file_path, 'w', newline='') as file:
+
+            # fieldnames from the keys of the header dictionary, recurring_entries[0]
+            fieldnames = list(recurring_entries[0].keys())
+
+            recurring_writer = csv.DictWriter(file, fieldnames=fieldnames)
+
+            # the header is recurring_entries[0], written as the first row
+            recurring_writer.writerows(recurring_entries)
+            print(f"Recurring expenses saved to {file_path}")
+
+        return True
+
+    except FileNotFoundError:
+        print(f"Error: The file path '{file_path}' could not be found.")
+        return None
+
+    except PermissionError:
+        print(f"Error: You do not have permission to write to '{file_path}'.")
+        return None
+
+    except IsADirectoryError:
+        print(f"Error: The path '{file_path}' is a directory, not a file.")
+        return None
+
+    except Exception as err:
+        print(f"Error while creating/writing the '{file_path}' file: {err}")
+        traceback.print_exc()
+        return None
+
+
+# user interface to save expenses from global list 'expense_entries' to expenses.csv file
+def save_expenses():
+    
+    # user is done adding expense, save the expenses to a file
+    save_request = input("Do you want to save all expenses to a file? (y/n): ").strip().lower()
+
+    if save_request == 'y':
+    
+        file_path = input("Enter the file path to save the expenses (default is ~/expenses.csv): ")
+
+        # first row is the header
+        if not expense_entries:
+
+        # no expenses loaded (exists); initialize expense_entries
+        # create expense header dictionary and insert in the new 'expense_enries'
+            expense_header_dict = {
+                "Timestamp": "Timestamp",
+                "Transaction Date": "Transaction Date",
+                "Amount": "Amount",
+                "Category": "Category",
+                "Description": "Description",
+                "ID": "ID"
+            }
+
+            expense_entries.insert (0, expense_header_dict)
+
+        # save to CSV file
+        save_expenses_to_file(file_path)
+    
+    else:
+        print("Expenses were not saved.")
+
+    return None
+
+
+# save expenses in global list 'expense_entries' to expenses.csv file
+def save_expenses_to_file(file_path=None):
+
+    global ledger_dirty, persisted_expense_id
+
+    if not expense_entries:
+        print("No expenses to save.")
+        return
+
+    # default to global EXPENSE_FILE if no path is provided
+    file_path = file_path or EXPENSE_FILE
+
+    try:
+        # the background journal fold writes the expense file as well
+        with journal_lock:
+            # pen the file in write mode ('w') to overwrite existing content
+            with open(file_path, 'w', newline='') as file:
+                # derive fieldnames from the first dictionary in expense_entries
+                fieldnames = list(expense_entries[0].keys())
+            
+                # create a CSV DictWriter
+                expense_writer = csv.DictWriter(file, fieldnames=fieldnames)
+
+                # check if the first entry in 'expense_entries' already has a header
+                # assume that if the first entry is a dictionary with keys matching the fieldnames,
+                # it's the header (since fieldnames are extracted from the first dictionary).
+                if isinstance(expense_entries[0], dict):
+
+                    # only write the header if the first row in expense_entries isn't already the header
+                    if list(expense_entries[0].keys()) != fieldnames:
+                        expense_writer.writeheader()
+
+                # write the expense entries, deleted (tombstone) slots are skipped
+                expense_writer.writerows(row for row in expense_entries if row is not None)
+                print(f"Expenses saved to {file_path} successfully.")
+
+            # the ledger file now matches memory, journaled corrections included
+            if file_path == EXPENSE_FILE:
+                ledger_dirty = False
+                persisted_expense_id = next_expense_id
+
+                if os.path.exists(get_journal_path(file_path)):
+                    os.remove(get_journal_path(file_path))
+
+    except FileNotFoundError:
+        print(f"Error: The file path '{file_path}' could not be found.")
+        return None
+    
+    except PermissionError:
+        print(f"Error: You do not have permission to write to '{file_path}'.")
+        return None
+
+    except IsADirectoryError:
+        print(f"Error: The path '{file_path}' is a directory, not a file.")
+        return None
+
+    except Exception as err:
+        print(f"Error while creating/writing the '{file_path}' file: {err}")
+        traceback.print_exc()
+        return None
+
+
+# user interface to export a filtered selection of expenses to CSV or JSON Lines
+def export_expenses():
+
+    file_path = input("Enter the export file path: ").strip()
+
+    if not file_path:
+        print("Error: The export file path is empty.")
+        return False
+
+    export_format = input("Export format (csv, jsonl) [csv]: ").strip().lower() or "csv"
+    compress = input("Compress with gzip? (y/n): ").strip().lower() == 'y'
+
+    print("Filters, press enter to skip.")
+    t_month = input("Month (YYYY-MM): ").strip() or None
+    start_date = input("From date (YYYY-MM-DD): ").strip() or None
+    end_date = input("To date (YYYY-MM-DD): ").strip() or None
+    category = input("Category: ").strip() or None
+    min_amount = input("Minimum amount: ").strip() or None
+    max_amount = input("Maximum amount: ").strip() or None
+
+    source_path = prompt_ledger_file()
+
+    if source_path is None:
+        return False
+
+    include_recurring = input("Include recurring expenses? (y/n): ").strip().lower() == 'y'
+
+    return export_expenses_to_file(file_path, export_format, compress, t_month, start_date, end_date,
+                                   category, min_amount, max_amount, source_path, include_recurring) is not None
+
+
+# stream expenses matching the filters to a CSV or JSON Lines file, optionally gzip compressed
+# rows flow through generators in batches of EXPORT_BATCH_ROWS, memory use does not grow with the ledger
+# 'include_recurring' adds the recurring occurrences within the date filters, or the ledger's span when open-ended
+# returns (row count, bytes written) or None on error
+def export_expenses_to_file(file_path, export_format="csv", compress=False, t_month=None, start_date=None,
+                            end_date=None, category=None, min_amount=None, max_amount=None, source_path=None,
+                            include_recurring=False):
+
+    # validate filter arguments
+    if export_format not in ("csv", "jsonl"):
+        print(f"Error: '{export_format}' is an invalid export format. Please use csv or jsonl.")
+        return None
+
+    if t_month is not None and not validate_month_format(t_month):
+        return None
+
+    if start_date is not None and not validate_date(start_date):
+        return None
+
+    if end_date is not None and not validate_date(end_date):
+        return None
+
+    if category is not None and not validate_category(category):
+        return None
+
+    if min_amount is not None and not validate_amount(min_amount):
+        return None
+
+    if max_amount is not None and not validate_amount(max_amount):
+        return None
+
+    if include_recurring and get_source_ledger(source_path) is None:
+        return None
+
+    # normalized, e.g. 2024-3-7 -> 2024-03-07, the filters compare dates as text
+    if start_date is not None:
+        start_date = datetime.strptime(start_date.strip(), DATE_FORMAT).strftime(DATE_FORMAT)
+
+    if end_date is not None:
+        end_date = datetime.strptime(end_date.strip(), DATE_FORMAT).strftime(DATE_FORMAT)
+
+    if start_date is not None and end_date is not None and start_date > end_date:
+        print(f"Error: The from date '{start_date}' is after the to date '{end_date}'.")
+        return None
+
+    if min_amount is not None and max_amount is not None and float(min_amount) > float(max_amount):
+        print(f"Error: The minimum amount '{min_amount}' is greater than the maximum amount '{max_amount}'.")
+        return None
+
+    # a month is a date range, narrowed by the from/to dates if both are given
+    if t_month is not None:
+        m_start, m_end = get_month_bounds(t_month)
+        start_date = max(start_date or "", m_start.strftime(DATE_FORMAT))
+        end_date = min(end_date or "9999-12-31", m_end.strftime(DATE_FORMAT))
+
+    try:
+
+        source = iter_expense_source(source_path, include_recurring,
+                                     start_date[:7] if start_date else None, end_date[:7] if end_date else None)
+
+        rows = filter_expense_rows(source, start_date, end_date, category,
+                                   float(min_amount) if min_amount is not None else None,
+                                   float(max_amount) if max_amount is not None else None)
+
+        if export_format == "jsonl":
+            chunks = iter_jsonl_chunks(rows)
+        else:
+            chunks = iter_csv_chunks(rows)
+
+        start_time = time.perf_counter()
+        row_count = 0
+        bytes_written = 0
+
+        # large buffered writes, gzip compresses each batch on its way to the buffered file
+        with open(file_path, 'wb', buffering=EXPORT_BUFFER_BYTES) as file:
+
+            export_file = gzip.GzipFile(fileobj=file, mode='wb') if compress else file
+
+            try:
+                for chunk_rows, chunk in chunks:
+                    export_file.write(chunk)
+                    row_count += chunk_rows
+                    bytes_written += len(chunk)
+
+            finally:
+                if compress:
+                    export_file.close()
+
+        elapsed = max(time.perf_counter() - start_time, 1e-9)
+        file_bytes = os.path.getsize(file_path)
+
+        print(f"Exported {row_count} expense(s) to {file_path} in {elapsed:.2f}s ({row_count / elapsed:,.0f} rows/s).")
+        print(f"Bytes written: {bytes_written}" + (f" ({file_bytes} compressed)" if compress else ""))
+
+        return row_count, file_bytes
+
+    except FileNotFoundError:
+        print(f"Error: The file path '{file_path}' could not be found.")
+        return None
+
+    except PermissionError:
+        print(f"Error: You do not have permission to write to '{file_path}'.")
+        return None
+
+    except IsADirectoryError:
+        print(f"Error: The path '{file_path}' is a directory, not a file.")
+        return None
+
+    except Exception as err:
+        print(f"Error while exporting to the '{file_path}' file: {err}")
+        traceback.print_exc()
+        return None
+
+
+# keep the expense rows matching every given filter; dates are ISO strings and compare as text
+def filter_expense_rows(rows, start_date=None, end_date=None, category=None, min_amount=None, max_amount=None):
+
+    category = category.strip().lower() if category else None
+
+    for row in rows:
+
+        f_date = row["Transaction Date"]
+
+        if start_date is not None and f_date < start_date:
+            continue
+
+        if end_date is not None and f_date > end_date:
+            continue
+
+        if category is not None and row["Category"].lower() != category:
+            continue
+
+        if min_amount is not None or max_amount is not None:
+
+            f_amount = float(row["Amount"])
+
+            if min_amount is not None and f_amount < min_amount:
+                continue
+
+            if max_amount is not None and f_amount > max_amount:
+                continue
+
+        yield row
+
+
+# encode expense rows as CSV, yields (row count, bytes) per batch, the header first
+def iter_csv_chunks(rows):
+
+    buffer = io.StringIO()
+    csv_writer = csv.writer(buffer)
+
+    csv_writer.writerow(EXPENSE_HEADER)
+    yield 0, buffer.getvalue().encode()
+
+    while True:
+
+        batch = list(itertools.islice(rows, EXPORT_BATCH_ROWS))
+
+        if not batch:
+            break
+
+        buffer.seek(0)
+        buffer.truncate()
+
+        csv_writer.writerows([row[header] for header in EXPENSE_HEADER] for row in batch)
+        yield len(batch), buffer.getvalue().encode()
+
+
+# encode expense rows as JSON Lines, one object per line; yields (row count, bytes) per batch
+def iter_jsonl_chunks(rows):
+
+    while True:
+
+        batch = list(itertools.islice(rows, EXPORT_BATCH_ROWS))
+
+        if not batch:
+            break
+
+        lines = "\n".join(json.dumps({header: row[header] for header in EXPENSE_HEADER}) for row in batch)
+        yield len(batch), (lines + "\n").encode()
+
+
+# user interface for the multi-ledger workspace
+def workspace_menu():
+
+    while True:
+        print(f"\n\n--- Workspace Menu (active ledger: {active_ledger}) ---\n")
+        print("1. List ledgers")
+        print("2. Register ledger")
+        print("3. Switch ledger")
+        print("4. Add category")
+        print("5. Cross-ledger rollup")
+        print("6. Back")
+
+        choice = input("Please select an option (1-6): ")
+
+        if choice == '1':
+            list_ledgers()
+
+        elif choice == '2':
+            name = input("Enter the ledger name: ").strip()
+            expense_file = input("Enter the ledger expense file path: ").strip()
+            budget_file = input("Enter the ledger budget file path (optional): ").strip()
+            recurring_file = input("Enter the ledger recurring expenses file path (optional): ").strip()
+
+            if register_ledger(name, expense_file, budget_file, recurring_file):
+                save_workspace_to_file()
+
+        elif choice == '3':
+            if not switch_ledger(input("Enter the ledger name: ").strip()):
+                print("\nWarning: Failed to Switch ledger...")
+
+        elif choice == '4':
+            name = input("Enter the category name: ")
+            description = input("Enter a description (optional): ")
+
+            if add_category(name, description):
+                save_categories_to_file()
+
+        elif choice == '5':
+            t_month = input("Enter month YYYY-MM (optional, default is all months): ").strip()
+            print_ledger_rollup(t_month or None)
+
+        elif choice == '6' or choice == 'x' or choice == 'X':
+            break
+
+        else:
+            print("\nInvalid option. Please choose a number between 1 and 6.\n")
+
+    return True
+
+
+# register a ledger in the workspace; it is only loaded when first switched to
+def register_ledger(name, expense_file, budget_file="", recurring_file=""):
+
+    if not name or "," in name:
+        print(f"Error: '{name}' is an invalid ledger name.")
+        return False
+
+    if name in ledger_registry:
+        print(f"Error: A ledger named '{name}' is already registered.")
+        return False
+
+    if not expense_file:
+        print("Error: The ledger expense file path is empty.")
+        return False
+
+    expense_file = os.path.expanduser(expense_file)
+
+    # default budget and recurring files next to the expense file
+    if not budget_file:
+        budget_file = os.path.splitext(expense_file)[0] + "_budget.csv"
+
+    if not recurring_file:
+        recurring_file = os.path.splitext(expense_file)[0] + "_recurring.csv"
+
+    ledger_registry[name] = {
+        "Name": name,
+        "Expense File": expense_file,
+        "Budget File": os.path.expanduser(budget_file),
+        "Recurring File": os.path.expanduser(recurring_file)
+    }
+
+    print(f"Ledger '{name}' registered.")
+    return True
+
+
+# make a registered ledger active, loading it on first access
+def switch_ledger(name):
+
+    global active_ledger, EXPENSE_FILE, BUDGET_FILE, RECURRING_FILE
+
+    if name not in ledger_registry:
+        print(f"Error: No ledger named '{name}'. Registered ledgers: {', '.join(ledger_registry)}")
+        return False
+
+    if name == active_ledger:
+        return True
+
+    with ledger_lock:
+
+        previous_ledger = active_ledger
+        previous_state = get_ledger_state()
+        previous_files = (EXPENSE_FILE, BUDGET_FILE, RECURRING_FILE)
+
+        EXPENSE_FILE = ledger_registry[name]["Expense File"]
+        BUDGET_FILE = ledger_registry[name]["Budget File"]
+        RECURRING_FILE = ledger_registry[name]["Recurring File"]
+        active_ledger = name
+
+        ledger_state = workspace_ledgers.get(name)
+
+        if ledger_state is None:
+            set_ledger_state(None)
+            invalidate_ledger_cache(name)
+
+            # missing files are an empty ledger, unreadable ones a failed switch
+            loaded = ((not os.path.exists(EXPENSE_FILE) or load_expenses()) and
+                      (not os.path.exists(BUDGET_FILE) or load_budget()) and
+                      (not os.path.exists(RECURRING_FILE) or load_recurring()))
+
+            if not loaded:
+                EXPENSE_FILE, BUDGET_FILE, RECURRING_FILE = previous_files
+                active_ledger = previous_ledger
+                set_ledger_state(previous_state)
+
+                print(f"Error: Ledger '{name}' could not be loaded, ledger '{previous_ledger}' stays active.")
+                return False
+
+            ledger_state = get_ledger_state()
+            print(f"Ledger '{name}' loaded.")
+
+        else:
+            set_ledger_state(ledger_state)
+
+        # park the previous ledger's state, it stays loaded until unloaded by the memory budget
+        workspace_ledgers[previous_ledger] = previous_state
+        workspace_ledgers[name] = ledger_state
+        workspace_ledgers.move_to_end(name)
+
+    unload_ledgers()
+
+    print(f"Active ledger: '{name}'")
+    return True
+
+
+# the active ledger's state, from the module globals
+def get_ledger_state():
+
+    live_rows = len(expense_entries) - 1 - tombstone_count
+
+    return {
+        "expense_entries": expense_entries,
+        "expense_index": expense_index,
+        "month_totals": month_totals,
+        "next_expense_id": next_expense_id,
+        "persisted_expense_id": persisted_expense_id,
+        "tombstone_count": tombstone_count,
+        "budget_entries": budget_entries,
+        "recurring_entries": recurring_entries,
+        "dirty": ledger_dirty,
+        "bytes": max(live_rows, 0) * get_expense_row_bytes()
+    }
+
+
+# restore a ledger state into the module globals, None for an empty ledger
+def set_ledger_state(ledger_state):
+
+    global expense_entries, expense_index, month_totals, next_expense_id, persisted_expense_id
+    global tombstone_count, budget_entries, recurring_entries, ledger_dirty
+
+    ledger_state = ledger_state or {
+        "expense_entries": [],
+        "expense_index": {},
+        "month_totals": {},
+        "next_expense_id": 1,
+        "persisted_expense_id": 1,
+        "tombstone_count": 0,
+        "budget_entries": [],
+        "recurring_entries": [],
+        "dirty": False
+    }
+
+    expense_entries = ledger_state["expense_entries"]
+    expense_index = ledger_state["expense_index"]
+    month_totals = ledger_state["month_totals"]
+    next_expense_id = ledger_state["next_expense_id"]
+    persisted_expense_id = ledger_state["persisted_expense_id"]
+    tombstone_count = ledger_state["tombstone_count"]
+    budget_entries = ledger_state["budget_entries"]
+    recurring_entries = ledger_state["recurring_entries"]
+    ledger_dirty = ledger_state["dirty"]
+
+
+# approximate memory of one expense row: its dictionary, index entry and values
+# categories are interned and shared, so they are not counted
+def get_expense_row_bytes():
+
+    for row in reversed(expense_entries):
+
+        if row is not None and isinstance(row["ID"], int):
+            return (sys.getsizeof(row) + 100 +
+                    sum(sys.getsizeof(value) for header, value in row.items() if header != "Category"))
+
+    return 0
+
+
+# unload least recently used ledgers while the workspace is over WORKSPACE_MAX_BYTES
+# the active ledger and ledgers with unsaved changes are never unloaded
+def unload_ledgers():
+
+    workspace_bytes = sum(ledger_state["bytes"] for ledger_state in workspace_ledgers.values())
+
+    for name in list(workspace_ledgers):
+
+        if workspace_bytes <= WORKSPACE_MAX_BYTES:
+            break
+
+        ledger_state = workspace_ledgers[name]
+
+        if name == active_ledger:
+            continue
+
+        if ledger_state["dirty"]:
+            print(f"Warning: Ledger '{name}' has unsaved changes and stays loaded.")
+            continue
+
+        # the month totals outlive the rows, rollups do not need to reload the ledger
+        save_ledger_summary(name, ledger_state["month_totals"])
+
+        del workspace_ledgers[name]
+        invalidate_ledger_cache(name)
+        workspace_bytes -= ledger_state["bytes"]
+        print(f"Ledger '{name}' unloaded.")
+
+    return workspace_bytes
 
-        with open(file_path, 'w', newline='') as file:
 
-            # fieldnames from the keys of the first dictionary in expense_entries
-            fieldnames = list(budget_entries[0].keys())
+# path of the month totals summary kept next to a ledger's expense file
+def get_ledger_summary_path(name):
 
-            budget_writer = csv.DictWriter(file, fieldnames=fieldnames)
+    return ledger_registry[name]["Expense File"] + ".summary.json"
 
-            # add header only if file doesn't 
-            if not file_exists:
-                budget_writer.writeheader()
-            
-            # write the expense entries; skip header budget_entries[0]
-            budget_writer.writerows(budget_entries)
-            print(f"Budget saved to {file_path}")
-            
-    except FileNotFoundError:
-        print(f"Error: The file path '{file_path}' could not be found.")
-        return None
-    
-    except PermissionError:
-        print(f"Error: You do not have permission to write to '{file_path}'.")
-        return None
 
-    except IsADirectoryError:
-        print(f"Error: The path '{file_path}' is a directory, not a file.")
+# modification time and size of a ledger's expense file and of its journal (0 when there is none)
+# journal appends leave the expense file unchanged, so both are needed to tell a summary is stale
+def get_ledger_file_stamp(expense_file):
+
+    file_stat = os.stat(expense_file)
+    journal_path = get_journal_path(expense_file)
+
+    if not os.path.exists(journal_path):
+        return [file_stat.st_mtime, file_stat.st_size, 0, 0]
+
+    journal_stat = os.stat(journal_path)
+    return [file_stat.st_mtime, file_stat.st_size, journal_stat.st_mtime, journal_stat.st_size]
+
+
+# save a ledger's month totals, stamped with its expense file's and journal's size and modification time
+def save_ledger_summary(name, ledger_month_totals):
+
+    expense_file = ledger_registry[name]["Expense File"]
+
+    if not os.path.exists(expense_file):
         return None
 
-    except Exception as err:
-        print(f"Error while creating/appending the file: {err}")
-        traceback.print_exc()
+    ledger_summary = {
+        "stamp": get_ledger_file_stamp(expense_file),
+        "month_totals": {t_month: list(totals) for t_month, totals in ledger_month_totals.items()}
+    }
+
+    ledger_summaries[name] = ledger_summary
+
+    try:
+        with open(get_ledger_summary_path(name), 'w') as file:
+            json.dump(ledger_summary, file)
+
+        return True
+
+    except OSError as err:
+        print(f"Warning: Could not save the summary of ledger '{name}': {err}")
         return None
 
 
-# user interface to track month's expenses
-# month argument expects YYYY-MM format
-def track_budget(b_month = None):
+# month totals of a ledger: from memory when loaded, otherwise from its summary,
+# rebuilt by one streaming pass over the expense file when the file or its journal changed since
+def get_ledger_month_totals(name):
 
-    if b_month is not None:
+    if name == active_ledger:
+        return month_totals
 
-        if not validate_month_format(b_month):
+    if name in workspace_ledgers:
+        return workspace_ledgers[name]["month_totals"]
 
-            cntr = 0
-            while True:
+    expense_file = ledger_registry[name]["Expense File"]
 
-                #get user input
-                b_month = input("\nPlease enter transaction month YYYY-MM : ")
-                b_month = b_month.strip()  # clean up date input
-                #b_month.strftime(MONTH_FORMAT)
-            
-                if validate_month_format(b_month):
-                    break
+    if not os.path.exists(expense_file):
+        return {}
 
-                else:
-                    print(f"\nInvalid month format {b_month}, please use YYYY-MM.")
-                    cntr += 1
-                    if cntr >= 3:
-                        print(f"Warning: Max retry exceeded, exiting track_budget...")
-                        return False 
+    ledger_summary = ledger_summaries.get(name)
 
-    else:
-    
-        b_month = CURRENT_MONTH_DATE
-     
-    if not budget_entries:
-        print(f"Error: No budget allocation for the month of {CURRENT_MONTH_NAME} is defined")
-        return False
+    if ledger_summary is None and os.path.exists(get_ledger_summary_path(name)):
 
-    try:
+        try:
+            with open(get_ledger_summary_path(name), 'r') as file:
+                ledger_summary = json.load(file)
 
-        if not view_running_month_expenses(b_month):
-            # handle expected valication return 'False' explicitly
-            return False
+        except (OSError, ValueError):
+            ledger_summary = None
 
-    except ValueError:
-        print(f"Error: The month '{b_month}' is invalid. Please use the YYYY-MM format.")
-        traceback.print_exc()
-        return False
-        
-    return True
+    # summaries saved before the journal was stamped have no "stamp" and are rebuilt
+    if ledger_summary is not None and ledger_summary.get("stamp") == get_ledger_file_stamp(expense_file):
+        ledger_summaries[name] = ledger_summary
+        return ledger_summary["month_totals"]
 
+    # stale or missing summary, the rows are streamed with the journal applied and not kept
+    ledger_month_totals = {}
 
-# display month running expenses from global 'expense_entries' list ( of dictionaries )
-def view_running_month_expenses(t_month):
+    for row in iter_journaled_file_rows(expense_file):
+        totals = ledger_month_totals.setdefault(row["Transaction Date"][:7], [0.0, 0])
+        totals[0] += row["Amount"]
+        totals[1] += 1
 
-    # check if the 'expense_entries' list is empty
-    if not expense_entries:
-        print("No expenses to display. The global list 'expense_entries' is empty.")
-        return False
+    for totals in ledger_month_totals.values():
+        totals[0] = round(totals[0], 2)
 
-    if not validate_month_format(t_month):
-        return False
-    
-    # format input date for consistency
-    c_month = t_month.strip()  # clean up date input
-    o_date = datetime.strptime(c_month, MONTH_FORMAT) # convert to datetime object
-    f_date = o_date.strftime(MONTH_FORMAT)  # formatted date
-    month_name = o_date.strftime("%B") 
+    save_ledger_summary(name, ledger_month_totals)
+    return ledger_month_totals
 
-    # get dictionary size using the expense entry header
-    expense_dict_size = len(expense_entries[0])
-    
-    running_month_expenses =  0.0           
-    transaction_count = 0
 
-    for row in expense_entries[1:]:
-          
-        if len(row) == expense_dict_size:
+# recurring rules of a ledger: from memory when loaded, otherwise read from its recurring file
+def get_ledger_recurring_entries(name):
+
+    if name == active_ledger:
+        return recurring_entries
+
+    if name in workspace_ledgers:
+        return workspace_ledgers[name]["recurring_entries"]
+
+    recurring_file = ledger_registry[name]["Recurring File"]
+
+    if not os.path.exists(recurring_file):
+        return []
+
+    try:
+        return read_recurring_file(recurring_file)
+
+    except OSError as err:
+        print(f"Warning: Could not read the recurring expenses of ledger '{name}': {err}")
+        return []
+
+
+# total and transaction count of every ledger for a month (all months if None), and the grand total
+# recurring occurrences are included, over the ledger's span (see get_recurring_months) for all months
+def get_ledger_rollup(t_month=None):
+
+    ledger_rollup = {}
+
+    for name in ledger_registry:
+
+        ledger_month_totals = get_ledger_month_totals(name)
+        rules = get_ledger_recurring_entries(name)
+
+        if t_month is not None:
+            total, count = ledger_month_totals.get(t_month, [0.0, 0])
+            rollup_months = [t_month]
 
-            if f_date in row["Transaction Date"]:
-                transaction_count += 1 
-                running_month_expenses += round(float(row["Amount"]), 2)
         else:
-            print(f"Incomplete expense entry; '{row}' ")
+            total = sum((totals[0] for totals in ledger_month_totals.values()), 0.0)
+            count = sum(totals[1] for totals in ledger_month_totals.values())
 
-    # note 'budget_entries[0]' is the header, skip
-    # and 'budget_entries[1]' is a string, convert it to float 
-    if not budget_entries:
-        print(f"Budget is not loaded, please load month's budget first")
+            rollup_months = get_recurring_months(rules, ledger_month_totals)
+
+        for r_month in rollup_months:
+            recurring_total, recurring_count = get_recurring_month_total(r_month, rules)
+            total += recurring_total
+            count += recurring_count
+
+        ledger_rollup[name] = (round(total, 2), count)
+
+    grand_total = round(sum(total for total, count in ledger_rollup.values()), 2)
+    grand_count = sum(count for total, count in ledger_rollup.values())
+
+    return ledger_rollup, (grand_total, grand_count)
+
+
+# print the cross-ledger rollup
+def print_ledger_rollup(t_month=None):
+
+    if t_month is not None and not validate_month_format(t_month):
         return False
-    
-    month_budget_allocation = float(budget_entries[1]["Amount"])
+
+    ledger_rollup, (grand_total, grand_count) = get_ledger_rollup(t_month)
+    name_width = max(len("Ledger"), max(len(name) for name in ledger_rollup))
 
     print(f"\n{'-' * 40}")
-    print(f"\n   Expenses for the month of {month_name}")
-    print(f"\n{'-' * 40}")
-    print(f"\nRunning total: ${running_month_expenses}")
-    print(f"Total number of transactions: {transaction_count}")
-    print(f"This month's budget allocation: ${month_budget_allocation} \n")
-    if running_month_expenses <= month_budget_allocation:
-        print(f"You have ${month_budget_allocation - running_month_expenses} left for this month.\n") 
-        print(f" {'-' * 40}\n")
+    print(f"\n   Expenses by ledger for {t_month or 'all months'}")
+    print(f"\n{'-' * 40}\n")
 
-    elif running_month_expenses > month_budget_allocation:
-        print(f"You have exceeded your month of {month_name} budget by ${month_budget_allocation - running_month_expenses}.\n") 
-        print(f" {'-' * 40}\n")
+    for name, (total, count) in ledger_rollup.items():
+        print(f"{name.ljust(name_width)} | ${str(total).ljust(12)} | {count} transaction(s)")
 
-    return running_month_expenses
+    print(f"\n{'Total'.ljust(name_width)} | ${str(grand_total).ljust(12)} | {grand_count} transaction(s)")
+    print(f"\n {'-' * 40}\n")
 
+    return True
 
-# read budget.csv and populate global list 'expense_entries' 
-def load_budget(file_path=None):
 
-    global budget_entries
+# list the registered ledgers and whether they are loaded
+def list_ledgers():
 
-    # clear stale entries
+    print("")
 
-    budget_entries = []
+    for name, ledger in ledger_registry.items():
+
+        if name == active_ledger:
+            status = "active"
+        elif name in workspace_ledgers:
+            status = "loaded"
+        else:
+            status = "not loaded"
+
+        print(f"{name.ljust(20)} {status.ljust(10)} {ledger['Expense File']}")
+
+    return True
+
+
+# add a user-defined category to the shared category table
+def add_category(name, description=""):
+
+    c_name = name.strip().upper() if isinstance(name, str) else ""
+
+    if not c_name or "," in c_name:
+        print(f"Error: '{name}' is an invalid category name.")
+        return False
+
+    if c_name in category_table:
+        print(f"Error: The category '{c_name}' already exists.")
+        return False
+
+    category_table[c_name] = description.strip() or "user-defined category"
+    intern_category(c_name)
+
+    print(f"Category '{c_name}' added.")
+    return True
 
-    # default to the global constant EXPENSE_FILE if no path is provided
-    file_path = file_path or BUDGET_FILE
+
+# read categories.csv and add user-defined categories to the shared category table
+def load_categories(file_path=None):
+
+    # default to the global constant CATEGORY_FILE if no path is provided
+    file_path = file_path or CATEGORY_FILE
 
     try:
 
         if not os.path.exists(file_path):
-            print(f"Error: The file '{file_path}' does not exist.")        
             return False
-    
+
         with open(file_path, 'r', newline='') as file:
-            budget_reader = csv.reader(file)
+            category_reader = csv.reader(file)
 
-            # iterate over the rows
-            for row in budget_reader:
-                
-                # budget entry has atleast 4 columns, 5th column (Description is optional)
-                if len(row) >= 4:
-                    
-                    entry_date = row[0]
-                    b_month_name = row[1]
-                    b_date = row[2]
-                    b_amount = row[3]
+            for row in category_reader:
 
-                    try:
-                        b_description = row[4]
-                    
-                    except ValueError:
-                        print(f"Invalid row 'row[4]' or empty, skipping this entry.")
-                        continue
+                if not row or is_header_row(row, ["Category", "Description"]):
+                    continue
+
+                category_table[row[0].strip().upper()] = row[1] if len(row) > 1 else ""
 
-                # create the expense dictionary
-                budget_dict = {
-                    "Timestamp": entry_date,
-                    "Month": b_month_name,
-                     "Date": b_date,
-                     "Amount": b_amount,
-                    "Description": b_description
-                }
-    
-                # add the expense to the global list
-                budget_entries.append(budget_dict)
-        
         return True
-    
-    except FileNotFoundError:
-        print(f"Error: The file path '{file_path}' could not be found.")
+
+    except Exception as err:
+        print(f"Error while reading the '{file_path}' file: {err}")
+        traceback.print_exc()
         return False
-    
+
+
+# save the shared category table to categories.csv file
+def save_categories_to_file(file_path=None):
+
+    # default to global CATEGORY_FILE if no path is provided
+    file_path = file_path or CATEGORY_FILE
+
+    try:
+
+        with open(file_path, 'w', newline='') as file:
+            category_writer = csv.writer(file)
+
+            category_writer.writerow(["Category", "Description"])
+            category_writer.writerows(category_table.items())
+
+        print(f"Categories saved to {file_path}")
+        return True
+
     except PermissionError:
         print(f"Error: You do not have permission to write to '{file_path}'.")
-        return False
-
-    except IsADirectoryError:
-        print(f"Error: The path '{file_path}' is a directory, not a file.")
-        return False
+        return None
 
     except Exception as err:
-        print(f"Error while reading the '{file_path}' file: {err}")
+        print(f"Error while creating/writing the '{file_path}' file: {err}")
         traceback.print_exc()
-        return False
+        return None
 
 
-# user interface to save expenses from global list 'expense_entries' to expenses.csv file
-def save_expenses():
-    
-    # user is done adding expense, save the expenses to a file
-    save_request = input("Do you want to save all expenses to a file? (y/n): ").strip().lower()
+# read workspace.csv and register its ledgers
+def load_workspace(file_path=None):
 
-    if save_request == 'y':
-    
-        file_path = input("Enter the file path to save the expenses (default is ~/expenses.csv): ")
+    # default to the global constant WORKSPACE_FILE if no path is provided
+    file_path = file_path or WORKSPACE_FILE
 
-        # first row is the header
-        if len(expense_entries) < 2:
+    try:
 
-        # no expenses loaded (exists); initialize expense_entries
-        # create expense header dictionary and insert in the new 'expense_enries'
-            expense_header_dict = {
-                "Timestamp": "Timestamp",
-                "Transaction Date": "Transaction Date",
-                "Amount": "Amount",
-                "Category": "Category",
-                "Description": "Description"
-            }
+        if not os.path.exists(file_path):
+            return False
 
-            expense_entries.insert (0, expense_header_dict)
+        with open(file_path, 'r', newline='') as file:
+            workspace_reader = csv.reader(file)
 
-        # save to CSV file
-        save_expenses_to_file(file_path)
-    
-    else:
-        print("Expenses were not saved.")
+            for row in workspace_reader:
 
-    return None
+                if len(row) < 3 or is_header_row(row, WORKSPACE_HEADER):
+                    continue
 
+                # workspaces saved before per-ledger recurring files: the default ledger keeps RECURRING_FILE,
+                # the others get the default one next to their expense file
+                if len(row) > 3 and row[3]:
+                    recurring_file = row[3]
+                elif row[0] in ledger_registry:
+                    recurring_file = ledger_registry[row[0]]["Recurring File"]
+                else:
+                    recurring_file = os.path.splitext(row[1])[0] + "_recurring.csv"
 
-# save expenses in global list 'expense_entries' to expenses.csv file
-def save_expenses_to_file(file_path=None):
+                ledger_registry[row[0]] = {"Name": row[0], "Expense File": row[1], "Budget File": row[2],
+                                           "Recurring File": recurring_file}
 
-    if not expense_entries:
-        print("No expenses to save.")
-        return
+        return True
 
-    # default to global EXPENSE_FILE if no path is provided
-    file_path = file_path or EXPENSE_FILE
+    except Exception as err:
+        print(f"Error while reading the '{file_path}' file: {err}")
+        traceback.print_exc()
+        return False
+
+
+# save the registered ledgers to workspace.csv file
+def save_workspace_to_file(file_path=None):
+
+    # default to global WORKSPACE_FILE if no path is provided
+    file_path = file_path or WORKSPACE_FILE
 
     try:
-        # pen the file in write mode ('w') to overwrite existing content
-        with open(file_path, 'w', newline='') as file:
-            # derive fieldnames from the first dictionary in expense_entries
-            fieldnames = list(expense_entries[0].keys())
-            
-            # create a CSV DictWriter
-            expense_writer = csv.DictWriter(file, fieldnames=fieldnames)
 
-            # check if the first entry in 'expense_entries' already has a header
-            # assume that if the first entry is a dictionary with keys matching the fieldnames,
-            # it's the header (since fieldnames are extracted from the first dictionary).
-            if isinstance(expense_entries[0], dict):
+        with open(file_path, 'w', newline='') as file:
+            workspace_writer = csv.DictWriter(file, fieldnames=WORKSPACE_HEADER)
 
-                # only write the header if the first row in expense_entries isn't already the header
-                if list(expense_entries[0].keys()) != fieldnames:
-                    expense_writer.writeheader()
+            workspace_writer.writeheader()
+            workspace_writer.writerows(ledger_registry.values())
 
-            # write the expense entries
-            expense_writer.writerows(expense_entries)
-            print(f"Expenses saved to {file_path} successfully.")
+        print(f"Workspace saved to {file_path}")
+        return True
 
-    except FileNotFoundError:
-        print(f"Error: The file path '{file_path}' could not be found.")
-        return None
-    
     except PermissionError:
         print(f"Error: You do not have permission to write to '{file_path}'.")
         return None
 
-    except IsADirectoryError:
-        print(f"Error: The path '{file_path}' is a directory, not a file.")
-        return None
-
     except Exception as err:
         print(f"Error while creating/writing the '{file_path}' file: {err}")
         traceback.print_exc()
@@ -797,15 +3664,23 @@ def save_expenses_to_file(file_path=None):
 def menu():
     while True:
         # print the menu options
-        print("\n\n--- Expense Tracker Menu ---\n")
+        print(f"\n\n--- Expense Tracker Menu (ledger: {active_ledger}) ---\n")
         print("1. Add expense")
         print("2. View expenses")
         print("3. Track budget")
         print("4. Save expenses")
-        print("5. Exit (x or X)")
+        print("5. Add recurring expense")
+        print("6. Edit expense")
+        print("7. Delete expense")
+        print("8. View sorted expenses")
+        print("9. View largest/smallest expenses")
+        print("10. View cache statistics")
+        print("11. Export expenses")
+        print("12. Workspace (ledgers, categories)")
+        print("13. Exit (x or X)")
 
         # get user input
-        choice = input("Please select an option (1-5): ")
+        choice = input("Please select an option (1-13): ")
 
         # Process user input
         if choice == '1':
@@ -826,19 +3701,53 @@ def menu():
             if not save_expenses():  # save expenses
                 print("\nWarning: Failed to Save expenses...")
                 
-        elif choice == '5' or choice == 'x' or choice == 'X':
+        elif choice == '5':
+            if not add_recurring_expenses():  # add a recurring expense rule
+                print("\nWarning: Failed to Add recurring expenses...")
+
+        elif choice == '6':
+            if not edit_expenses():  # edit an expense by ID
+                print("\nWarning: Failed to Edit expenses...")
+
+        elif choice == '7':
+            if not delete_expenses():  # delete an expense by ID
+                print("\nWarning: Failed to Delete expenses...")
+
+        elif choice == '8':
+            if not view_sorted_expenses():  # sorted view by date, amount or category
+                print("\nWarning: Failed to View sorted expenses...")
+
+        elif choice == '9':
+            if not view_top_expenses():  # top/bottom N by amount
+                print("\nWarning: Failed to View largest/smallest expenses...")
+
+        elif choice == '10':
+            print_cache_stats()  # query cache hit/miss counters
+
+        elif choice == '11':
+            if not export_expenses():  # filtered export to CSV or JSON Lines
+                print("\nWarning: Failed to Export expenses...")
+
+        elif choice == '12':
+            workspace_menu()  # multi-ledger workspace
+
+        elif choice == '13' or choice == 'x' or choice == 'X':
             print("\nExiting the program. Goodbye!\n\n")
             break  # Exit the loop and end the program
         else:
-            print("\nInvalid option. Please choose a number between 1 and 5.\n")
+            print("\nInvalid option. Please choose a number between 1 and 13.\n")
 
         #clear_screen()
 
 # Main
 if __name__ == "__main__":
 
+    load_categories()
+    load_workspace()
+
     load_expenses()
     load_budget()
+    load_recurring()
 
     menu()
 